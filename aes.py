@@ -6,9 +6,8 @@ if available, libssl will be used instead, otherwise
 the Python implementation will be used.
 """
 import os
-import pyaes
 import logging
-from . import libssl
+from . import aesfallback, libssl
 
 
 __log__ = logging.getLogger(__name__)
@@ -31,6 +30,15 @@ class AES:
     Class that servers as an interface to encrypt and decrypt
     text through the AES IGE mode.
     """
+    @staticmethod
+    def releases_gil():
+        """
+        Whether `decrypt_ige` lets other Python threads run while it
+        works, so that calling it from a worker thread pays off.
+        """
+        # ctypes drops the GIL around the foreign call, cryptg holds it
+        return not cryptg and bool(libssl.decrypt_ige)
+
     @staticmethod
     def decrypt_ige(cipher_text, key, iv):
         """
@@ -42,31 +50,7 @@ class AES:
         if libssl.decrypt_ige:
             return libssl.decrypt_ige(cipher_text, key, iv)
 
-        iv1 = iv[:len(iv) // 2]
-        iv2 = iv[len(iv) // 2:]
-
-        aes = pyaes.AES(key)
-
-        plain_text = []
-        blocks_count = len(cipher_text) // 16
-
-        cipher_text_block = [0] * 16
-        for block_index in range(blocks_count):
-            for i in range(16):
-                cipher_text_block[i] = \
-                    cipher_text[block_index * 16 + i] ^ iv2[i]
-
-            plain_text_block = aes.decrypt(cipher_text_block)
-
-            for i in range(16):
-                plain_text_block[i] ^= iv1[i]
-
-            iv1 = cipher_text[block_index * 16:block_index * 16 + 16]
-            iv2 = plain_text_block
-
-            plain_text.extend(plain_text_block)
-
-        return bytes(plain_text)
+        return aesfallback.decrypt_ige(cipher_text, key, iv)
 
     @staticmethod
     def encrypt_ige(plain_text, key, iv):
@@ -79,33 +63,9 @@ class AES:
             plain_text += os.urandom(16 - padding)
 
         if cryptg:
-            return cryptg.encrypt_ige(plain_text, key, iv)
+            # cryptg only takes bytes, while the sender passes a bytearray
+            return cryptg.encrypt_ige(bytes(plain_text), key, iv)
         if libssl.encrypt_ige:
             return libssl.encrypt_ige(plain_text, key, iv)
 
-        iv1 = iv[:len(iv) // 2]
-        iv2 = iv[len(iv) // 2:]
-
-        aes = pyaes.AES(key)
-
-        cipher_text = []
-        blocks_count = len(plain_text) // 16
-
-        for block_index in range(blocks_count):
-            plain_text_block = list(
-                plain_text[block_index * 16:block_index * 16 + 16]
-            )
-            for i in range(16):
-                plain_text_block[i] ^= iv1[i]
-
-            cipher_text_block = aes.encrypt(plain_text_block)
-
-            for i in range(16):
-                cipher_text_block[i] ^= iv2[i]
-
-            iv1 = cipher_text_block
-            iv2 = plain_text[block_index * 16:block_index * 16 + 16]
-
-            cipher_text.extend(cipher_text_block)
-
-        return bytes(cipher_text)
+        return aesfallback.encrypt_ige(plain_text, key, iv)
@@ -1,12 +1,50 @@
 """
 This module holds the AESModeCTR wrapper class.
+
+If available, cryptography will be used, otherwise
+if available, libssl will be used, otherwise
+the Python implementation will be used.
 """
-import pyaes
+import logging
+
+from . import aesfallback, libssl
+
+__log__ = logging.getLogger(__name__)
+
+try:
+    from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+except ImportError:
+    Cipher = None
+
+
+class _CryptographyCTR:
+    """AES CTR through the cryptography package"""
+
+    def __init__(self, key, iv):
+        self._ctx = Cipher(algorithms.AES(key), modes.CTR(iv)).encryptor()
+
+    def encrypt(self, data):
+        return self._ctx.update(data)
+
+    decrypt = encrypt
+
+
+# Fastest first; the first one available is used
+BACKENDS = [
+    backend for backend in (
+        Cipher and _CryptographyCTR,
+        libssl.CTR,
+        aesfallback.CTR
+    ) if backend
+]
+
+if BACKENDS[0] is aesfallback.CTR:
+    __log__.info('cryptography module not installed and libssl not found, '
+                 'falling back to (slower) Python AES CTR')
 
 
 class AESModeCTR:
-    """Wrapper around pyaes.AESModeOfOperationCTR mode with custom IV"""
-    # TODO Maybe make a pull request to pyaes to support iv on CTR
+    """Wrapper around AES CTR mode with custom IV"""
 
     def __init__(self, key, iv):
         """
@@ -15,13 +53,10 @@ class AESModeCTR:
         :param key: the key to be used as bytes.
         :param iv: the bytes initialization vector. Must have a length of 16.
         """
-        # TODO Use libssl if available
         assert isinstance(key, bytes)
-        self._aes = pyaes.AESModeOfOperationCTR(key)
-
         assert isinstance(iv, bytes)
         assert len(iv) == 16
-        self._aes._counter._counter = list(iv)
+        self._aes = BACKENDS[0](key, iv)
 
     def encrypt(self, data):
         """
@@ -0,0 +1,219 @@
+"""
+Audio Cache
+Content-addressed on-disk store for audio downloaded from Telegram
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import time
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+EVICTION_POLICIES = ('lru', 'lfu')
+
+# How many (account, message id) -> document mappings are remembered
+MAX_KNOWN_MESSAGES = 10000
+
+
+def document_key(document):
+    """Cache key for a Telegram document, stable across messages"""
+    return hashlib.sha256(f"{document.id}:{document.access_hash}".encode()).hexdigest()
+
+
+def unlink_all(paths):
+    for path in paths:
+        path.unlink(missing_ok=True)
+
+
+async def run_blocking(func, *args):
+    """Run file I/O on the default executor so streams keep flowing meanwhile"""
+    return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+
+
+class AudioCacheWriter:
+    """Writes one file into the cache, published atomically on commit
+
+    All file I/O happens on the executor; each write is awaited, so the
+    chunk may be reused by the caller once it returns.
+    """
+
+    def __init__(self, cache, key):
+        self.cache = cache
+        self.key = key
+        self.tmp_path = cache.path_for(key).with_name(f"{key}.{uuid.uuid4().hex}.tmp")
+        self.file = None
+        self.size = 0
+
+    def _write(self, chunk):
+        if self.file is None:
+            self.tmp_path.parent.mkdir(parents=True, exist_ok=True)
+            self.file = open(self.tmp_path, 'wb')
+        self.file.write(chunk)
+
+    def _close(self):
+        if self.file is not None:
+            self.file.close()
+
+    def _discard(self):
+        self._close()
+        self.tmp_path.unlink(missing_ok=True)
+
+    async def write(self, chunk):
+        await run_blocking(self._write, chunk)
+        self.size += len(chunk)
+
+    async def commit(self):
+        """Publish the written file under its key"""
+        await run_blocking(self._close)
+        await self.cache.add(self.key, self.tmp_path, self.size)
+
+    async def abort(self):
+        """Discard a partially written file"""
+        await run_blocking(self._discard)
+
+
+class AudioCache:
+    """Byte-budgeted audio store evicting by LRU or LFU"""
+
+    def __init__(self, root, max_bytes, policy='lru'):
+        if policy not in EVICTION_POLICIES:
+            raise ValueError(f"Unknown audio cache policy: {policy}")
+
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.policy = policy
+        # key -> {'size', 'hits', 'last_access'}
+        self.index = {}
+        self.total_bytes = 0
+        # (account, message id) -> (key, content type), so a message whose
+        # document is cached can be served without fetching it from Telegram
+        self.known_messages = OrderedDict()
+
+        self.stats = {
+            'hits': 0,
+            'misses': 0,
+            'evictions': 0
+        }
+
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.load_index()
+
+    def load_index(self):
+        """Rebuild the index from files left by a previous run"""
+        for path in self.root.glob('*/*'):
+            if path.suffix == '.tmp':
+                # Interrupted write
+                path.unlink(missing_ok=True)
+                continue
+
+            stat = path.stat()
+            self.index[path.name] = {'size': stat.st_size, 'hits': 0, 'last_access': stat.st_mtime}
+            self.total_bytes += stat.st_size
+
+        if self.index:
+            logger.info(f"💾 Audio cache holds {len(self.index)} files ({self.total_bytes} bytes)")
+        self.evict(0)
+
+    def path_for(self, key):
+        return self.root / key[:2] / key
+
+    async def get(self, key):
+        """Return the path of a cached file, or None"""
+        entry = self.index.get(key)
+        path = self.path_for(key)
+
+        if entry is None or not await run_blocking(path.exists):
+            if entry is not None:
+                self.forget(key)
+            self.stats['misses'] += 1
+            return None
+
+        entry['hits'] += 1
+        entry['last_access'] = time.time()
+        self.stats['hits'] += 1
+        return path
+
+    def contains(self, key):
+        """Check for a cached file without counting a hit or miss"""
+        return key in self.index
+
+    def remember_message(self, account, message_id, key, content_type):
+        """Note which document a message holds"""
+        self.known_messages[(account, message_id)] = (key, content_type)
+        self.known_messages.move_to_end((account, message_id))
+        while len(self.known_messages) > MAX_KNOWN_MESSAGES:
+            self.known_messages.popitem(last=False)
+
+    def message_key(self, account, message_id):
+        """The (key, content type) of a message's document if it is cached, or None"""
+        known = self.known_messages.get((account, message_id))
+        if known is None or known[0] not in self.index:
+            return None
+        return known
+
+    def writer(self, key):
+        """Start writing a file into the cache"""
+        return AudioCacheWriter(self, key)
+
+    async def add(self, key, tmp_path, size):
+        """Move a fully written file into place and account for it"""
+        if key in self.index or size > self.max_bytes:
+            await run_blocking(unlink_all, [tmp_path])
+            return
+
+        # The index is only touched here on the loop; the evicted files are
+        # deleted and the new one moved into place on the executor
+        victims = self.take_victims(size)
+        await run_blocking(self._publish, tmp_path, self.path_for(key), victims)
+        if key in self.index:
+            # Another transfer published the same document meanwhile
+            return
+        self.index[key] = {'size': size, 'hits': 0, 'last_access': time.time()}
+        self.total_bytes += size
+
+    @staticmethod
+    def _publish(tmp_path, path, victims):
+        unlink_all(victims)
+        os.replace(tmp_path, path)
+
+    def forget(self, key):
+        """Drop a key from the index, returning the path of its file"""
+        entry = self.index.pop(key, None)
+        if entry:
+            self.total_bytes -= entry['size']
+        return self.path_for(key)
+
+    def remove(self, key):
+        self.forget(key).unlink(missing_ok=True)
+
+    def take_victims(self, incoming_bytes):
+        """Drop entries until incoming_bytes more fit, returning their paths"""
+        victims = []
+        while self.index and self.total_bytes + incoming_bytes > self.max_bytes:
+            if self.policy == 'lfu':
+                victim = min(self.index, key=lambda x: (self.index[x]['hits'], self.index[x]['last_access']))
+            else:
+                victim = min(self.index, key=lambda x: self.index[x]['last_access'])
+
+            victims.append(self.forget(victim))
+            self.stats['evictions'] += 1
+        return victims
+
+    def evict(self, incoming_bytes):
+        """Evict files until incoming_bytes more fit in the budget"""
+        unlink_all(self.take_victims(incoming_bytes))
+
+    def get_stats(self):
+        """Get cache statistics"""
+        return {
+            **self.stats,
+            'files': len(self.index),
+            'bytes': self.total_bytes,
+            'max_bytes': self.max_bytes,
+            'policy': self.policy
+        }
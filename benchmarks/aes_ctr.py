@@ -0,0 +1,44 @@
+"""
+Compares the AES CTR backends available to ``telethon.crypto.aesctr``,
+as used by the obfuscated transports and the CDN decrypter.
+
+    python benchmarks/aes_ctr.py
+"""
+import os
+import timeit
+
+from telethon.crypto import aesctr
+
+SIZES = (1024, 64 * 1024, 1024 * 1024)
+
+
+def backend_name(backend):
+    return '{}.{}'.format(backend.__module__.rsplit('.', 1)[-1], backend.__name__)
+
+
+def main():
+    key = os.urandom(32)
+    iv = os.urandom(16)
+    print('Backends:', ', '.join(map(backend_name, aesctr.BACKENDS)))
+
+    for size in SIZES:
+        data = os.urandom(size)
+
+        # Every backend must produce the same stream, also across calls
+        expected = None
+        for backend in aesctr.BACKENDS:
+            ctr = backend(key, iv)
+            result = ctr.encrypt(data[:size // 3]) + ctr.encrypt(data[size // 3:])
+            if expected is None:
+                expected = result
+            assert result == expected, '{} disagrees'.format(backend_name(backend))
+
+        for backend in aesctr.BACKENDS:
+            ctr = backend(key, iv)
+            number, elapsed = timeit.Timer(lambda: ctr.encrypt(data)).autorange()
+            print('{:>10} bytes  {:<26} {:>10.2f} MB/s'.format(
+                size, backend_name(backend), size * number / elapsed / 1024 / 1024))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+"""
+Measures the pure-Python AES used when neither cryptg nor libssl are
+available, against the pyaes block-by-block code it replaced and, when
+present, the native backends.
+
+    python benchmarks/aes_fallback.py [max size in MB, 50 by default]
+
+pyaes is only measured up to 1MB, since it would take minutes above that.
+"""
+import os
+import sys
+import time
+
+import pyaes
+
+from telethon.crypto import aesfallback, libssl
+
+try:
+    import cryptg
+except ImportError:
+    cryptg = None
+
+SIZES = (1024, 64 * 1024, 1024 * 1024, 10 * 1024 * 1024, 50 * 1024 * 1024)
+PYAES_MAX_SIZE = 1024 * 1024
+
+
+def pyaes_encrypt_ige(plain_text, key, iv):
+    # The fallback as it was before aesfallback
+    iv1 = iv[:len(iv) // 2]
+    iv2 = iv[len(iv) // 2:]
+    aes = pyaes.AES(key)
+    cipher_text = []
+    for block_index in range(len(plain_text) // 16):
+        plain_text_block = list(plain_text[block_index * 16:block_index * 16 + 16])
+        for i in range(16):
+            plain_text_block[i] ^= iv1[i]
+        cipher_text_block = aes.encrypt(plain_text_block)
+        for i in range(16):
+            cipher_text_block[i] ^= iv2[i]
+        iv1 = cipher_text_block
+        iv2 = plain_text[block_index * 16:block_index * 16 + 16]
+        cipher_text.extend(cipher_text_block)
+    return bytes(cipher_text)
+
+
+def pyaes_ctr(key, iv):
+    ctr = pyaes.AESModeOfOperationCTR(key)
+    ctr._counter._counter = list(iv)
+    return ctr
+
+
+def measure(name, size, function):
+    start = time.perf_counter()
+    function()
+    elapsed = time.perf_counter() - start
+    print('{:>10} bytes  {:<28} {:>10.2f} MB/s'.format(
+        size, name, size / elapsed / 1024 / 1024))
+
+
+def main():
+    max_size = float(sys.argv[1]) * 1024 * 1024 if len(sys.argv) > 1 else SIZES[-1]
+    key = os.urandom(32)
+    iv = os.urandom(32)
+
+    # Same results as the code it replaces, including the CTR stream across calls
+    data = os.urandom(4096)
+    assert aesfallback.encrypt_ige(data, key, iv) == pyaes_encrypt_ige(data, key, iv)
+    assert aesfallback.decrypt_ige(aesfallback.encrypt_ige(data, key, iv), key, iv) == data
+    ctr = aesfallback.CTR(key, iv[:16])
+    assert ctr.encrypt(data[:100]) + ctr.encrypt(data[100:]) == \
+        pyaes_ctr(key, iv[:16]).encrypt(data)
+
+    for size in SIZES:
+        if size > max_size:
+            break
+
+        data = os.urandom(size)
+        measure('aesfallback.encrypt_ige', size, lambda: aesfallback.encrypt_ige(data, key, iv))
+        measure('aesfallback.decrypt_ige', size, lambda: aesfallback.decrypt_ige(data, key, iv))
+        measure('aesfallback.CTR', size, lambda: aesfallback.CTR(key, iv[:16]).encrypt(data))
+
+        if size <= PYAES_MAX_SIZE:
+            measure('pyaes encrypt_ige', size, lambda: pyaes_encrypt_ige(data, key, iv))
+            measure('pyaes CTR', size, lambda: pyaes_ctr(key, iv[:16]).encrypt(data))
+
+        if cryptg:
+            measure('cryptg.encrypt_ige', size, lambda: cryptg.encrypt_ige(data, key, iv))
+        if libssl.encrypt_ige:
+            measure('libssl.encrypt_ige', size, lambda: libssl.encrypt_ige(data, key, iv))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+"""
+Measures how fast ``telethon.extensions.BinaryReader`` deserializes the
+kind of responses that make up most of the incoming traffic.
+
+Payloads recorded from ``messages.GetHistory`` or ``updates.GetDifference``
+(the raw bytes of the result, starting with its constructor ID) can be
+given as arguments. Otherwise, similar ones are generated.
+
+    python benchmarks/binary_reader.py [payload.bin ...]
+"""
+import datetime
+import inspect
+import os
+import sys
+import timeit
+
+from telethon.extensions import BinaryReader
+from telethon.tl import types
+from telethon.tl.types import messages, updates
+
+DATE = datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+def build(cls, **fields):
+    # Fill any other required parameter of this layer with an empty vector
+    for name, param in inspect.signature(cls.__init__).parameters.items():
+        if name != 'self' and param.default is param.empty:
+            fields.setdefault(name, [])
+    return cls(**fields)
+
+
+def make_message(i):
+    return build(
+        types.Message,
+        id=i,
+        peer_id=types.PeerChannel(1000 + i % 7),
+        from_id=types.PeerUser(i % 50),
+        date=DATE,
+        message='Message number {} with some text to read 🎵'.format(i) * 3,
+        entities=[types.MessageEntityBold(0, 7), types.MessageEntityUrl(10, 20)],
+        views=i * 3,
+        forwards=i,
+        reply_to=types.MessageReplyHeader(reply_to_msg_id=i - 1),
+    )
+
+
+def make_user(i):
+    return build(
+        types.User,
+        id=i,
+        access_hash=i * 7919,
+        first_name='User {}'.format(i),
+        last_name='Surname',
+        username='user{}'.format(i),
+        status=types.UserStatusRecently(),
+    )
+
+
+def make_chat(i):
+    return build(
+        types.Chat,
+        id=1000 + i,
+        title='Chat {}'.format(i),
+        photo=types.ChatPhotoEmpty(),
+        participants_count=i * 10,
+        date=DATE,
+        version=1,
+    )
+
+
+def generated_payloads():
+    history = build(
+        messages.Messages,
+        messages=[make_message(i) for i in range(100)],
+        chats=[make_chat(i) for i in range(7)],
+        users=[make_user(i) for i in range(50)],
+    )
+    difference = build(
+        updates.Difference,
+        new_messages=[make_message(i) for i in range(1000)],
+        new_encrypted_messages=[],
+        other_updates=[types.UpdateReadHistoryInbox(
+            peer=types.PeerUser(i), max_id=i, still_unread_count=0, pts=i, pts_count=1
+        ) for i in range(200)],
+        chats=[make_chat(i) for i in range(50)],
+        users=[make_user(i) for i in range(500)],
+        state=updates.State(pts=1, qts=1, date=DATE, seq=1, unread_count=0),
+    )
+    return [('GetHistory (100 messages)', bytes(history)),
+            ('GetDifference (1000 messages)', bytes(difference))]
+
+
+def main():
+    if len(sys.argv) > 1:
+        payloads = []
+        for path in sys.argv[1:]:
+            with open(path, 'rb') as fd:
+                payloads.append((os.path.basename(path), fd.read()))
+    else:
+        payloads = generated_payloads()
+
+    for name, data in payloads:
+        obj = BinaryReader(data).tgread_object()
+        assert bytes(obj) == data, '{} does not round-trip'.format(name)
+
+        number, elapsed = timeit.Timer(
+            lambda: BinaryReader(data).tgread_object()).autorange()
+        per_call = elapsed / number
+        print('{:<32} {:>9} bytes {:>9.2f} ms {:>9.2f} MB/s'.format(
+            name, len(data), per_call * 1000, len(data) / per_call / 1024 / 1024))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""
+Compares reading big results eagerly against reading them with their
+vectors left lazy (``BinaryReader.lazy_types``), when only the state and
+a few messages are looked at afterwards.
+
+Takes the same arguments as ``binary_reader.py``.
+
+    python benchmarks/lazy_vectors.py [payload.bin ...]
+"""
+import sys
+import timeit
+import tracemalloc
+
+from telethon.extensions import BinaryReader
+
+from binary_reader import generated_payloads
+
+
+def use(result):
+    # What a caller interested in a handful of fields would touch
+    for name in ('state', 'count', 'pts'):
+        getattr(result, name, None)
+    for name in ('messages', 'new_messages'):
+        for message in getattr(result, name, ())[:10]:
+            message.id
+
+
+def read(data):
+    result = BinaryReader(data).tgread_object()
+    use(result)
+    return result
+
+
+def measure(data):
+    number, elapsed = timeit.Timer(lambda: read(data)).autorange()
+    tracemalloc.start()
+    result = read(data)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return elapsed / number, size
+
+
+def main():
+    if len(sys.argv) > 1:
+        payloads = []
+        for path in sys.argv[1:]:
+            with open(path, 'rb') as fd:
+                payloads.append((path, fd.read()))
+    else:
+        payloads = generated_payloads()
+
+    for name, data in payloads:
+        eager = BinaryReader(data).tgread_object()
+        eager_time, eager_size = measure(data)
+
+        BinaryReader.lazy_types = {eager.CONSTRUCTOR_ID}
+        try:
+            lazy = BinaryReader(data).tgread_object()
+            assert lazy.to_dict() == eager.to_dict(), 'lazy {} differs'.format(name)
+            assert bytes(lazy) == data, 'lazy {} does not round-trip'.format(name)
+            lazy_time, lazy_size = measure(data)
+        finally:
+            BinaryReader.lazy_types = frozenset()
+
+        print(name)
+        print('  eager {:>9.2f} ms {:>9.1f} KB'.format(eager_time * 1000, eager_size / 1024))
+        print('  lazy  {:>9.2f} ms {:>9.1f} KB'.format(lazy_time * 1000, lazy_size / 1024))
+
+
+if __name__ == '__main__':
+    main()
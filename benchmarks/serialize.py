@@ -0,0 +1,55 @@
+"""
+Measures how fast common requests are serialized through ``bytes(request)``,
+and how fast ``TLObject.serialize_bytes`` is, which generated code calls for
+every string and bytes field.
+
+    python benchmarks/serialize.py
+"""
+import os
+import timeit
+
+from telethon.tl import functions, types
+from telethon.tl.tlobject import TLObject
+
+
+def requests():
+    peer = types.InputPeerUser(user_id=123456789, access_hash=-987654321)
+    yield 'SendMessageRequest', functions.messages.SendMessageRequest(
+        peer=peer,
+        message='Now playing: some artist - some song (remastered) 🎵',
+        random_id=1234567890123,
+        reply_to=types.InputReplyToMessage(reply_to_msg_id=42),
+        entities=[types.MessageEntityBold(0, 11), types.MessageEntityItalic(13, 11)],
+    )
+    yield 'GetFileRequest', functions.upload.GetFileRequest(
+        location=types.InputDocumentFileLocation(
+            id=5555555555, access_hash=-4444444444,
+            file_reference=os.urandom(32), thumb_size=''
+        ),
+        offset=512 * 1024,
+        limit=512 * 1024,
+        precise=True,
+    )
+    yield 'SaveFilePartRequest', functions.upload.SaveFilePartRequest(
+        file_id=777, file_part=3, bytes=os.urandom(512 * 1024)
+    )
+
+
+def measure(func):
+    number, elapsed = timeit.Timer(func).autorange()
+    return elapsed / number
+
+
+def main():
+    for name, request in requests():
+        print('{:<22} bytes() {:>8.2f} us'.format(
+            name, measure(lambda: bytes(request)) * 1e6))
+
+    for size in (10, 300, 64 * 1024):
+        data = os.urandom(size)
+        print('serialize_bytes({:>6})      {:>8.2f} us'.format(
+            size, measure(lambda: TLObject.serialize_bytes(data)) * 1e6))
+
+
+if __name__ == '__main__':
+    main()
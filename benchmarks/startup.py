@@ -0,0 +1,77 @@
+"""
+Measures how long ``import telethon`` takes and how much memory it
+allocates, and then the latency of a first request: serializing it and
+reading back its result, which is when the classes involved are loaded.
+
+Every run happens in a new interpreter, so that nothing is cached.
+
+    python benchmarks/startup.py [runs]
+"""
+import json
+import subprocess
+import sys
+
+from binary_reader import generated_payloads
+
+CHILD = '''
+import json, sys, time, tracemalloc
+
+trace = sys.argv[1] == 'trace'
+result = sys.stdin.buffer.read()
+
+if trace:
+    tracemalloc.start()
+start = time.perf_counter()
+import telethon
+imported = time.perf_counter()
+if trace:
+    size, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(json.dumps({'size': size, 'peak': peak}))
+    sys.exit()
+
+from telethon.extensions import BinaryReader
+from telethon.tl import functions, types
+
+def request():
+    data = bytes(functions.messages.GetHistoryRequest(
+        types.InputPeerSelf(), offset_id=0, offset_date=None, add_offset=0,
+        limit=100, max_id=0, min_id=0, hash=0))
+    return data, BinaryReader(result).tgread_object()
+
+start_first = time.perf_counter()
+request()
+first = time.perf_counter() - start_first
+
+start_next = time.perf_counter()
+request()
+after = time.perf_counter() - start_next
+
+print(json.dumps({'import': imported - start, 'first': first, 'after': after}))
+'''
+
+
+def run(result, mode):
+    out = subprocess.run([sys.executable, '-c', CHILD, mode], input=result,
+                         stdout=subprocess.PIPE, check=True).stdout
+    return json.loads(out)
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    # The result of a GetHistory, generated here so the child reads it cold
+    _, result = generated_payloads()[0]
+    results = [run(result, 'time') for _ in range(runs)]
+    results += [run(result, 'trace') for _ in range(runs)]
+
+    def best(key):
+        return min(r[key] for r in results if key in r)
+
+    print('import telethon {:>9.1f} ms {:>9.1f} MB ({:.1f} MB peak)'.format(
+        best('import') * 1000, best('size') / 1024 / 1024, best('peak') / 1024 / 1024))
+    print('first request   {:>9.2f} ms'.format(best('first') * 1000))
+    print('next request    {:>9.2f} ms'.format(best('after') * 1000))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""
+Measures how much memory the objects of big results take once read,
+and how many of them still carry an instance ``__dict__`` (that is,
+whose classes were generated without ``__slots__``).
+
+No class declares ``__slots__`` yet: the ones that make up a difference
+(``types.Message``, ``User``, ``Chat``, the ``Update*`` types...) are
+generated, and only the generator could add them. Declaring them on the
+base and core classes alone was measured to save nothing: 8500 of the
+8502 objects in the generated difference kept a ``__dict__``, at about
+417 bytes each either way.
+
+Takes the same arguments as ``binary_reader.py``, so a large recorded
+``updates.GetDifference`` can be given to measure a real sync.
+
+    python benchmarks/tl_memory.py [payload.bin ...]
+"""
+import os
+import sys
+import tracemalloc
+
+from telethon.extensions import BinaryReader
+from telethon.tl.tlobject import TLObject
+
+from binary_reader import generated_payloads
+
+
+def walk(obj):
+    # Every TLObject reachable from the result, including the given one
+    pending = [obj]
+    while pending:
+        obj = pending.pop()
+        if isinstance(obj, TLObject):
+            yield obj
+            for cls in type(obj).__mro__:
+                pending.extend(getattr(obj, name, None)
+                               for name in getattr(cls, '__slots__', ()))
+            pending.extend(getattr(obj, '__dict__', {}).values())
+        elif isinstance(obj, list):
+            pending.extend(obj)
+
+
+def main():
+    if len(sys.argv) > 1:
+        payloads = []
+        for path in sys.argv[1:]:
+            with open(path, 'rb') as fd:
+                payloads.append((os.path.basename(path), fd.read()))
+    else:
+        payloads = generated_payloads()
+
+    for name, data in payloads:
+        tracemalloc.start()
+        result = BinaryReader(data).tgread_object()
+        size, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        count = with_dict = own_size = 0
+        for obj in walk(result):
+            count += 1
+            own_size += sys.getsizeof(obj)
+            if hasattr(obj, '__dict__'):
+                with_dict += 1
+                own_size += sys.getsizeof(obj.__dict__)
+
+        print(name)
+        print('  total     {:>9.1f} KB for {} bytes read'.format(size / 1024, len(data)))
+        print('  objects   {:>9} ({} with a __dict__)'.format(count, with_dict))
+        print('  instances {:>9.1f} KB ({:.0f} bytes each)'.format(
+            own_size / 1024, own_size / count))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,11 +1,10 @@
 """
 This module contains the BinaryReader utility class.
 """
-import os
+import struct
 import time
+from collections.abc import Sequence
 from datetime import datetime, timezone, timedelta
-from io import BytesIO
-from struct import unpack
 
 from ..errors import TypeNotFoundError
 from ..tl.alltlobjects import tlobjects
@@ -14,70 +13,131 @@ from ..tl.core import core_objects
 _EPOCH_NAIVE = datetime(*time.gmtime(0)[:6])
 _EPOCH = _EPOCH_NAIVE.replace(tzinfo=timezone.utc)
 
+# "All numbers are written as little endian."
+# https://core.telegram.org/mtproto
+_INT = struct.Struct('<i')
+_UINT = struct.Struct('<I')
+_LONG = struct.Struct('<q')
+_ULONG = struct.Struct('<Q')
+_FLOAT = struct.Struct('<f')
+_DOUBLE = struct.Struct('<d')
+
 
 class BinaryReader:
     """
     Small utility class to read binary data.
+
+    The data is read through a `memoryview` and a plain position, so
+    reading numbers or strings doesn't create intermediate `bytes`.
+    Byte arrays are still copied once by `read` and `tgread_bytes`,
+    since their results outlive the reader.
     """
+    # Constructor IDs of the objects whose vectors are read as `LazyVector`.
+    # Opt-in, and only meant for big results whose class does nothing but
+    # store its fields, like ``messages.Messages`` or ``updates.Difference``:
+    #
+    #     BinaryReader.lazy_types = {types.updates.Difference.CONSTRUCTOR_ID}
+    lazy_types = frozenset()
 
     def __init__(self, data):
-        self.stream = BytesIO(data)
+        # A view over a bytearray would keep it from being resized until
+        # close(), so anything but bytes is read from a copy
+        if not isinstance(data, bytes):
+            data = bytes(data)
+        self._data = data
+        self._view = memoryview(data)
+        self._pos = 0
         self._last = None  # Should come in handy to spot -404 errors
 
     # region Reading
 
-    # "All numbers are written as little endian."
-    # https://core.telegram.org/mtproto
+    def _unpack(self, fmt):
+        try:
+            value, = fmt.unpack_from(self._view, self._pos)
+        except struct.error:
+            self.read(fmt.size)  # raises the same error reading the bytes would
+            raise
+        self._pos += fmt.size
+        return value
+
     def read_byte(self):
         """Reads a single byte value."""
-        return self.read(1)[0]
-
+        try:
+            value = self._view[self._pos]
+        except IndexError:
+            self.read(1)
+            raise
+        self._pos += 1
+        return value
+
+    # Numbers are read very often (generated code reads flags and IDs through
+    # these), so `_unpack` is inlined in the two most common ones
     def read_int(self, signed=True):
         """Reads an integer (4 bytes) value."""
-        return int.from_bytes(self.read(4), byteorder='little', signed=signed)
+        try:
+            value, = (_INT if signed else _UINT).unpack_from(self._view, self._pos)
+        except struct.error:
+            self.read(4)
+            raise
+        self._pos += 4
+        return value
 
     def read_long(self, signed=True):
         """Reads a long integer (8 bytes) value."""
-        return int.from_bytes(self.read(8), byteorder='little', signed=signed)
+        try:
+            value, = (_LONG if signed else _ULONG).unpack_from(self._view, self._pos)
+        except struct.error:
+            self.read(8)
+            raise
+        self._pos += 8
+        return value
 
     def read_float(self):
         """Reads a real floating point (4 bytes) value."""
-        return unpack('<f', self.read(4))[0]
+        return self._unpack(_FLOAT)
 
     def read_double(self):
         """Reads a real floating point (8 bytes) value."""
-        return unpack('<d', self.read(8))[0]
+        return self._unpack(_DOUBLE)
 
     def read_large_int(self, bits, signed=True):
         """Reads a n-bits long integer value."""
         return int.from_bytes(
-            self.read(bits // 8), byteorder='little', signed=signed)
+            self._read_view(bits // 8), byteorder='little', signed=signed)
+
+    def _read_view(self, length):
+        """Like `read`, but returns a `memoryview` slice instead of a copy."""
+        pos = self._pos
+        if length < 0:
+            end = len(self._view)
+        else:
+            end = pos + length
+            if end > len(self._view):
+                result = self._view[pos:].tobytes()
+                raise BufferError(
+                    'No more data left to read (need {}, got {}: {}); last read {}'
+                    .format(length, len(result), repr(result), repr(self._last))
+                )
+
+        self._pos = end
+        return self._view[pos:end]
 
     def read(self, length=-1):
         """Read the given amount of bytes, or -1 to read all remaining."""
-        result = self.stream.read(length)
-        if (length >= 0) and (len(result) != length):
-            raise BufferError(
-                'No more data left to read (need {}, got {}: {}); last read {}'
-                .format(length, len(result), repr(result), repr(self._last))
-            )
-
+        result = self._read_view(length).tobytes()
         self._last = result
         return result
 
     def get_bytes(self):
         """Gets the byte array representing the current buffer as a whole."""
-        return self.stream.getvalue()
+        return bytes(self._data)
 
     # endregion
 
     # region Telegram custom reading
 
-    def tgread_bytes(self):
-        """
-        Reads a Telegram-encoded byte array, without the need of
-        specifying its length.
-        """
+    def _tgread_view(self):
+        """Reads a Telegram-encoded byte array as a `memoryview` slice."""
         first_byte = self.read_byte()
         if first_byte == 254:
             length = self.read_byte() | (self.read_byte() << 8) | (
@@ -87,16 +147,24 @@ class BinaryReader:
             length = first_byte
             padding = (length + 1) % 4
 
-        data = self.read(length)
+        data = self._read_view(length)
         if padding > 0:
-            padding = 4 - padding
-            self.read(padding)
+            self._read_view(4 - padding)
 
         return data
 
+    def tgread_bytes(self):
+        """
+        Reads a Telegram-encoded byte array, without the need of
+        specifying its length.
+        """
+        # Copied once, since the result outlives the reader
+        return self._tgread_view().tobytes()
+
     def tgread_string(self):
         """Reads a Telegram-encoded string."""
-        return str(self.tgread_bytes(), encoding='utf-8', errors='replace')
+        # Decoded straight from the buffer, there's no need for the bytes
+        return str(self._tgread_view(), encoding='utf-8', errors='replace')
 
     def tgread_bool(self):
         """Reads a Telegram boolean value."""
@@ -139,8 +207,41 @@ class BinaryReader:
                 self.set_position(pos)
                 raise error
 
+        elif self.lazy_types and constructor_id in self.lazy_types:
+            return self._tgread_lazy(clazz)
+
         return clazz.from_reader(self)
 
+    def _tgread_lazy(self, clazz):
+        """
+        Reads an object of the given class whose vectors of objects are
+        left unread as `LazyVector`. Its other objects are read as usual.
+        """
+        reader = _OffsetReader(self._view)
+        reader.set_position(self.tell_position())
+        obj = clazz.from_reader(reader)
+        self.set_position(reader.tell_position())
+
+        for name, value in vars(obj).items():
+            if isinstance(value, _Unread):
+                setattr(obj, name, self._read_at(value.offset))
+            elif value and isinstance(value, list) and isinstance(value[0], _Unread):
+                setattr(obj, name, LazyVector(self._data, [x.offset for x in value]))
+
+        return obj
+
+    def _read_at(self, offset):
+        reader = BinaryReader(self._data)
+        reader.set_position(offset)
+        return reader.tgread_object()
+
+    def skip_object(self):
+        """Moves past the next object without building it."""
+        reader = _SkipReader(self._view)
+        reader.set_position(self.tell_position())
+        reader.tgread_object()
+        self.set_position(reader.tell_position())
+
     def tgread_vector(self):
         """Reads a vector (a list) of Telegram objects."""
         if 0x1cb5c415 != self.read_int(signed=False):
@@ -152,25 +253,25 @@ class BinaryReader:
     # endregion
 
     def close(self):
-        """Closes the reader, freeing the BytesIO stream."""
-        self.stream.close()
+        """Closes the reader, releasing the view over the data."""
+        self._view.release()
 
     # region Position related
 
     def tell_position(self):
         """Tells the current position on the stream."""
-        return self.stream.tell()
+        return self._pos
 
     def set_position(self, position):
         """Sets the current position on the stream."""
-        self.stream.seek(position)
+        self._pos = position
 
     def seek(self, offset):
         """
         Seeks the stream position given an offset from the current position.
         The offset may be negative.
         """
-        self.stream.seek(offset, os.SEEK_CUR)
+        self._pos += offset
 
     # endregion
 
@@ -183,3 +284,96 @@ class BinaryReader:
         self.close()
 
     # endregion
+
+
+class _Unread:
+    """Where an object that was skipped over by `_OffsetReader` starts"""
+    __slots__ = ('offset',)
+
+    def __init__(self, offset):
+        self.offset = offset
+
+
+def _skipped(*args, **kwargs):
+    # Stands in for the class of the objects `_SkipReader` goes over
+    return None
+
+
+class _SkipReader(BinaryReader):
+    """
+    Goes over objects without building them, only to find where they end.
+
+    The generated ``from_reader`` are reused with `_skipped` in place of
+    the class, and strings and dates are stepped over instead of decoded.
+    """
+    def tgread_bytes(self):
+        # A view is enough for the few (core) types which look at these
+        return self._tgread_view()
+
+    def tgread_string(self):
+        self._tgread_view()
+        return ''
+
+    def tgread_date(self):
+        self._read_view(4)
+        return None
+
+    def tgread_object(self):
+        constructor_id = self.read_int(signed=False)
+        clazz = tlobjects.get(constructor_id, None)
+        if clazz is not None:
+            return clazz.from_reader.__func__(_skipped, self)
+
+        # Bools, vectors and core objects, whose items are skipped the same way
+        self.seek(-4)
+        return super().tgread_object()
+
+
+class _OffsetReader(BinaryReader):
+    """Reads numbers and strings as usual, but skips over all objects"""
+
+    def tgread_object(self):
+        offset = self.tell_position()
+        self.skip_object()
+        return _Unread(offset)
+
+
+class LazyVector(Sequence):
+    """
+    Vector of objects which are only read from the data the first time
+    they're accessed. Until then, only the position of each is kept.
+
+    Used for the vectors in the `BinaryReader.lazy_types`.
+    """
+    __slots__ = ('_data', '_offsets', '_items')
+
+    def __init__(self, data, offsets):
+        self._data = data
+        self._offsets = offsets
+        self._items = [_UNREAD] * len(offsets)
+
+    def __len__(self):
+        return len(self._offsets)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+
+        item = self._items[index]
+        if item is _UNREAD:
+            reader = BinaryReader(self._data)
+            reader.set_position(self._offsets[index])
+            item = self._items[index] = reader.tgread_object()
+
+        return item
+
+    def __eq__(self, other):
+        if isinstance(other, (list, LazyVector)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __repr__(self):
+        return repr(list(self))
+
+
+_UNREAD = object()
@@ -4,13 +4,23 @@ Handles music search requests and communicates with Telegram bot
 """
 
 import asyncio
+import json
 import logging
+import math
 import os
+import signal
+import time
 from aiohttp import web, ClientSession
+from yarl import URL
 import sys
 import os
 sys.path.append(os.path.dirname(__file__))
-from telegram_client import TelegramMusicClient
+from client_pool import TelegramClientPool, UnknownAccount, AccountUnavailable
+from search_cache import SearchCache, MISS
+from audio_cache import AudioCache, document_key
+from rate_limiter import RateLimiter, AdmissionController, AdmissionRejected
+from prefetcher import Prefetcher
+from metrics import registry, metrics_middleware, client_trace_config, time_stage
 from config import config
 
 # Configure logging
@@ -28,24 +38,81 @@ class TelegramBridge:
     def __init__(self):
         self.telegram_client = None
         self.session = None
+        # Set once shutdown starts; new searches are refused from then on
+        self.draining = False
+        self.active_transfers = 0
+        # Batch requests count as a whole, including queries still waiting to start
+        self.active_batches = 0
+        self.prefetcher = Prefetcher(self) if config['prefetch']['enabled'] else None
+        self.search_cache = SearchCache(
+            config['cache']['max_entries'],
+            config['cache']['ttl'],
+            config['cache']['negative_ttl'],
+            config['cache']['db_path']
+        )
+        self.audio_cache = AudioCache(
+            config['files']['audio_cache_dir'],
+            config['files']['audio_cache_max_bytes'],
+            config['files']['audio_cache_policy']
+        )
+        self.rate_limiter = RateLimiter(
+            config['search']['rate_limit'],
+            config['search']['rate_window'],
+            config['search']['rate_burst']
+        )
+        # Batches have a budget of their own, so a playlist isn't cut short
+        # by the per-search limit; their searches still wait for admission
+        self.batch_rate_limiter = RateLimiter(
+            config['search']['batch_rate_limit'],
+            config['search']['rate_window']
+        )
+        self.admission = AdmissionController(
+            config['search']['max_concurrent'],
+            config['search']['queue_size'],
+            config['search']['queue_timeout']
+        )
         
     async def initialize(self):
         """Initialize the Telegram client and HTTP session"""
         try:
             logger.info("🚀 Initializing Telegram Bridge...")
             
-            # Initialize Telegram client
-            self.telegram_client = TelegramMusicClient()
+            # Initialize Telegram client pool
+            self.telegram_client = TelegramClientPool()
             await self.telegram_client.connect()
             
             # Initialize HTTP session
-            self.session = ClientSession()
+            self.session = ClientSession(trace_configs=[client_trace_config()])
+            
+            if self.prefetcher:
+                self.prefetcher.start()
             
             logger.info("✅ Telegram Bridge initialized successfully")
         except Exception as e:
             logger.error(f"❌ Failed to initialize Telegram Bridge: {e}")
             raise
     
+    async def drain(self, timeout):
+        """Stop taking searches and wait for in-flight work, up to timeout seconds"""
+        self.draining = True
+        logger.info("🚰 Draining in-flight searches and transfers...")
+        
+        if self.prefetcher:
+            await self.prefetcher.stop()
+        
+        deadline = time.monotonic() + timeout
+        while self.in_flight() and time.monotonic() < deadline:
+            await asyncio.sleep(0.1)
+        
+        if self.in_flight():
+            logger.warning(f"⏰ Drain deadline reached with {self.in_flight()} requests still in flight")
+        else:
+            logger.info("✅ Drain completed")
+    
+    def in_flight(self):
+        """Number of searches, batches and audio transfers still running or queued"""
+        return self.admission.active + self.admission.queued + self.active_transfers + self.active_batches
+    
     async def cleanup(self):
         """Cleanup resources"""
         try:
@@ -54,6 +121,8 @@ class TelegramBridge:
             
             if self.session:
                 await self.session.close()
+            
+            await self.search_cache.close()
                 
             logger.info("🧹 Telegram Bridge cleanup completed")
         except Exception as e:
@@ -67,8 +136,15 @@ class TelegramBridge:
             
             logger.info(f"🔍 Searching for music: {query}")
             
-            # Search music using Telegram client
-            result = await self.telegram_client.search_music(query)
+            # Serve repeated queries from the cache
+            result = await self.search_cache.get(query)
+            if result is MISS:
+                # Search music using Telegram client
+                with time_stage('search'):
+                    result = await self.telegram_client.search_music(query)
+                await self.search_cache.set(query, result)
+            else:
+                logger.info(f"⚡ Cache hit for query: {query}")
             
             if result:
                 logger.info(f"✅ Music found: {result.get('title', 'Unknown')}")
@@ -77,6 +153,7 @@ class TelegramBridge:
                     'title': result.get('title'),
                     'artist': result.get('artist'),
                     'audio_url': result.get('audio_url'),
+                    'message_id': result.get('message_id'),
                     'duration': result.get('duration'),
                     'file_size': result.get('file_size')
                 }
@@ -94,6 +171,146 @@ class TelegramBridge:
                 'error': str(e)
             }
 
+    async def stream_audio(self, request, message_id, account=None):
+        """Stream a search result's audio, honouring HTTP Range requests"""
+        if not self.telegram_client:
+            raise Exception("Telegram client not initialized")
+        
+        # Counted from the start, so that draining waits for cache hits too
+        self.active_transfers += 1
+        try:
+            return await self._stream_audio(request, message_id, account)
+        finally:
+            self.active_transfers -= 1
+    
+    async def _stream_audio(self, request, message_id, account):
+        # A message seen before whose document is cached needs no Telegram round-trip
+        known = self.audio_cache.message_key(account, message_id)
+        if known:
+            cache_key, content_type = known
+            cached_path = await self.audio_cache.get(cache_key)
+            if cached_path:
+                return await self.send_cached(request, message_id, cached_path, content_type)
+        
+        message = await self.telegram_client.get_audio_message(message_id, account)
+        if not message:
+            raise web.HTTPNotFound(text='Audio not found')
+        
+        size = message.file.size
+        if size > config['files']['max_size']:
+            raise web.HTTPRequestEntityTooLarge(config['files']['max_size'], size)
+        
+        content_type = message.file.mime_type or 'audio/mpeg'
+        cache_key = document_key(message.document)
+        self.audio_cache.remember_message(account, message_id, cache_key, content_type)
+        cached_path = await self.audio_cache.get(cache_key)
+        if cached_path:
+            return await self.send_cached(request, message_id, cached_path, content_type)
+        
+        try:
+            byte_range = parse_range(request, size)
+        except ValueError:
+            raise web.HTTPRequestRangeNotSatisfiable(headers={'Content-Range': f'bytes */{size}'})
+        
+        start, stop = byte_range or (0, size)
+        response = web.StreamResponse(status=206 if byte_range else 200)
+        response.content_type = content_type
+        response.content_length = stop - start
+        response.headers['Accept-Ranges'] = 'bytes'
+        if byte_range:
+            response.headers['Content-Range'] = f'bytes {start}-{stop - 1}/{size}'
+        await response.prepare(request)
+        
+        # Only complete transfers can fill the cache
+        cache_writer = None if byte_range else self.audio_cache.writer(cache_key)
+        try:
+            # Parts are handed over as memoryviews and never released here:
+            # write() may return while the transport still holds the view
+            with time_stage('download'):
+                async for chunk in self.telegram_client.iter_audio(message, start, stop, account):
+                    if cache_writer:
+                        await cache_writer.write(chunk)
+                    await response.write(chunk)
+            await response.write_eof()
+            
+            if cache_writer:
+                await cache_writer.commit()
+                cache_writer = None
+        except ConnectionResetError:
+            logger.info(f"🔌 Client went away while streaming audio {message_id}")
+        except Exception as e:
+            # Headers are already sent, so the short body is the only signal left
+            logger.error(f"Error streaming audio {message_id}: {e}")
+        finally:
+            if cache_writer:
+                await cache_writer.abort()
+        
+        return response
+    
+    async def send_cached(self, request, message_id, path, content_type):
+        """Send a cached file with sendfile; FileResponse handles Range itself"""
+        response = CachedFileResponse(path, headers={'Content-Type': content_type})
+        try:
+            # Sends the whole file, so the transfer is over once this returns
+            await response.prepare(request)
+        except ConnectionResetError:
+            logger.info(f"🔌 Client went away while sending cached audio {message_id}")
+        return response
+
+class CachedFileResponse(web.FileResponse):
+    """FileResponse sent by the handler itself, while it is counted as a transfer"""
+    
+    async def prepare(self, request):
+        # aiohttp prepares returned responses again, which would resend the file
+        if self.prepared:
+            return None
+        return await super().prepare(request)
+
+def parse_range(request, size):
+    """Resolve the request's Range header to a [start, stop) byte span, or None"""
+    http_range = request.http_range
+    start, stop = http_range.start, http_range.stop
+    if start is None and stop is None:
+        return None
+    
+    if start is None:
+        start = 0
+    elif start < 0:
+        # Suffix range: the last N bytes
+        start = max(size + start, 0)
+    
+    if stop is None or stop > size:
+        stop = size
+    
+    if start >= stop:
+        raise ValueError('Range not satisfiable')
+    
+    return start, stop
+
+def client_key(request):
+    """Rate limit key: the peer address, or the client a trusted proxy names"""
+    if request.remote in config['server']['trusted_proxies']:
+        return request.headers.get('X-Client-Id') or request.remote
+    return request.remote
+
+def batch_query(query):
+    """A batch entry as a search query; anything but a string counts as empty"""
+    return query.strip() if isinstance(query, str) else ''
+
+def draining_response():
+    """Refuse new work while shutting down"""
+    return web.json_response({
+        'success': False,
+        'error': 'Server is shutting down'
+    }, status=503, headers={'Retry-After': str(config['server']['drain_timeout'])})
+
+def absolute_audio_url(request, result):
+    """Point a result's audio_url back at this bridge"""
+    audio_url = result.get('audio_url')
+    if audio_url and audio_url.startswith('/'):
+        result['audio_url'] = str(request.url.join(URL(audio_url)))
+    return result
+
 # Global bridge instance
 bridge = TelegramBridge()
 
@@ -115,10 +332,29 @@ async def handle_search(request):
                 'error': 'Query must be at least 2 characters long'
             }, status=400)
         
-        # Search for music
-        result = await bridge.search_music(query)
+        if bridge.draining:
+            return draining_response()
         
-        return web.json_response(result)
+        # Throttle each caller, then wait for a free search slot
+        client_id = client_key(request)
+        retry_after = bridge.rate_limiter.acquire(client_id)
+        if retry_after:
+            return web.json_response({
+                'success': False,
+                'error': 'Rate limit exceeded, please slow down'
+            }, status=429, headers={'Retry-After': str(math.ceil(retry_after))})
+        
+        try:
+            async with bridge.admission.slot():
+                # Search for music
+                result = await bridge.search_music(query)
+        except AdmissionRejected as e:
+            return web.json_response({
+                'success': False,
+                'error': str(e)
+            }, status=503, headers={'Retry-After': str(math.ceil(e.retry_after))})
+        
+        return web.json_response(absolute_audio_url(request, result))
         
     except Exception as e:
         logger.error(f"Error handling search request: {e}")
@@ -127,16 +363,138 @@ async def handle_search(request):
             'error': 'Internal server error'
         }, status=500)
 
+async def handle_search_batch(request):
+    """Handle many music searches in one request, streaming NDJSON results"""
+    try:
+        data = await request.json()
+        queries = data.get('queries')
+        
+        if not isinstance(queries, list) or not queries:
+            return web.json_response({
+                'success': False,
+                'error': 'Queries parameter must be a non-empty list'
+            }, status=400)
+        
+        if len(queries) > config['search']['batch_max_queries']:
+            return web.json_response({
+                'success': False,
+                'error': f"At most {config['search']['batch_max_queries']} queries per batch"
+            }, status=400)
+        
+        if bridge.draining:
+            return draining_response()
+        
+        # The whole batch costs the caller one token of the batch budget
+        retry_after = bridge.batch_rate_limiter.acquire(client_key(request))
+        if retry_after:
+            return web.json_response({
+                'success': False,
+                'error': 'Rate limit exceeded, please slow down'
+            }, status=429, headers={'Retry-After': str(math.ceil(retry_after))})
+        
+    except Exception as e:
+        logger.error(f"Error handling batch search request: {e}")
+        return web.json_response({
+            'success': False,
+            'error': 'Internal server error'
+        }, status=500)
+    
+    fanout = asyncio.Semaphore(config['search']['batch_concurrency'])
+    shutting_down = {
+        'success': False,
+        'error': 'Server is shutting down'
+    }
+    
+    async def run_query(index, query):
+        query = batch_query(query)
+        if len(query) < 2:
+            result = {
+                'success': False,
+                'error': 'Query must be at least 2 characters long'
+            }
+        elif bridge.draining:
+            result = shutting_down
+        else:
+            async with fanout:
+                try:
+                    # Draining may have started while this waited for its turn
+                    if bridge.draining:
+                        result = shutting_down
+                    else:
+                        async with bridge.admission.slot():
+                            result = absolute_audio_url(request, await bridge.search_music(query))
+                except AdmissionRejected as e:
+                    result = {
+                        'success': False,
+                        'error': str(e),
+                        'retry_after': math.ceil(e.retry_after)
+                    }
+        
+        return {'index': index, 'query': query, **result}
+    
+    logger.info(f"📋 Batch search for {len(queries)} queries")
+    bridge.active_batches += 1
+    try:
+        response = web.StreamResponse(headers={'Content-Type': 'application/x-ndjson'})
+        await response.prepare(request)
+        
+        tasks = [asyncio.ensure_future(run_query(index, query)) for index, query in enumerate(queries)]
+        try:
+            # Emit each result as soon as it completes, tagged with its index
+            for next_result in asyncio.as_completed(tasks):
+                line = await next_result
+                await response.write(json.dumps(line).encode() + b'\n')
+            await response.write_eof()
+        except ConnectionResetError:
+            logger.info("🔌 Client went away during batch search")
+        except Exception as e:
+            logger.error(f"Error streaming batch search results: {e}")
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+    finally:
+        bridge.active_batches -= 1
+    
+    return response
+
+async def handle_audio(request):
+    """Stream audio for a search result"""
+    try:
+        message_id = int(request.match_info['message_id'])
+        return await bridge.stream_audio(request, message_id, request.query.get('account'))
+        
+    except web.HTTPException:
+        raise
+    except UnknownAccount as e:
+        # Links cached before the account left the pool
+        return web.json_response({
+            'success': False,
+            'error': str(e)
+        }, status=404)
+    except AccountUnavailable as e:
+        return web.json_response({
+            'success': False,
+            'error': str(e)
+        }, status=503)
+    except Exception as e:
+        logger.error(f"Error streaming audio: {e}")
+        return web.json_response({
+            'success': False,
+            'error': 'Internal server error'
+        }, status=500)
+
 async def handle_health(request):
     """Health check endpoint"""
     try:
         telegram_status = bridge.telegram_client.is_connected() if bridge.telegram_client else False
         
+        # Report draining as unhealthy so traffic moves to another instance
         return web.json_response({
-            'status': 'healthy',
+            'status': 'draining' if bridge.draining else 'healthy',
             'telegram_connected': telegram_status,
             'timestamp': asyncio.get_event_loop().time()
-        })
+        }, status=503 if bridge.draining else 200)
     except Exception as e:
         logger.error(f"Error in health check: {e}")
         return web.json_response({
@@ -151,12 +509,24 @@ async def handle_status(request):
             stats = await bridge.telegram_client.get_stats()
             return web.json_response({
                 'connected': bridge.telegram_client.is_connected(),
-                'stats': stats
+                'stats': stats,
+                'cache': bridge.search_cache.get_stats(),
+                'audio_cache': bridge.audio_cache.get_stats(),
+                'rate_limit': bridge.rate_limiter.get_stats(),
+                'batch_rate_limit': bridge.batch_rate_limiter.get_stats(),
+                'admission': bridge.admission.get_stats(),
+                'prefetch': bridge.prefetcher.get_stats() if bridge.prefetcher else None
             })
         else:
             return web.json_response({
                 'connected': False,
-                'stats': {}
+                'stats': {},
+                'cache': bridge.search_cache.get_stats(),
+                'audio_cache': bridge.audio_cache.get_stats(),
+                'rate_limit': bridge.rate_limiter.get_stats(),
+                'batch_rate_limit': bridge.batch_rate_limiter.get_stats(),
+                'admission': bridge.admission.get_stats(),
+                'prefetch': bridge.prefetcher.get_stats() if bridge.prefetcher else None
             })
     except Exception as e:
         logger.error(f"Error getting status: {e}")
@@ -164,16 +534,41 @@ async def handle_status(request):
             'error': str(e)
         }, status=500)
 
+async def handle_metrics(request):
+    """Prometheus metrics endpoint"""
+    return web.Response(text=registry.render(), content_type='text/plain', charset='utf-8')
+
+async def on_startup(app):
+    """Connect to Telegram before the server starts accepting requests"""
+    await bridge.initialize()
+
+async def on_shutdown(app):
+    """Let in-flight searches and transfers finish before connections close"""
+    await bridge.drain(config['server']['drain_timeout'])
+
+async def on_cleanup(app):
+    """Disconnect from Telegram, flushing session state"""
+    await bridge.cleanup()
+
 async def init_app():
     """Initialize the web application"""
     app = web.Application()
     
+    # Lifecycle hooks
+    app.on_startup.append(on_startup)
+    app.on_shutdown.append(on_shutdown)
+    app.on_cleanup.append(on_cleanup)
+    
     # Add routes
     app.router.add_post('/search', handle_search)
+    app.router.add_post('/search/batch', handle_search_batch)
+    app.router.add_get(r'/audio/{message_id:\d+}', handle_audio)
     app.router.add_get('/health', handle_health)
     app.router.add_get('/status', handle_status)
+    app.router.add_get('/metrics', handle_metrics)
     
     # Add CORS headers
+    @web.middleware
     async def cors_handler(request, handler):
         response = await handler(request)
         response.headers['Access-Control-Allow-Origin'] = '*'
@@ -182,23 +577,21 @@ async def init_app():
         return response
     
     app.middlewares.append(cors_handler)
+    app.middlewares.append(metrics_middleware)
     
     return app
 
 async def main():
     """Main function"""
+    # Create web application
+    app = await init_app()
+    runner = web.AppRunner(app, shutdown_timeout=config['server']['drain_timeout'])
+    
     try:
-        # Initialize bridge
-        await bridge.initialize()
-        
-        # Create web application
-        app = await init_app()
-        
-        # Start server
+        # Start server; on_startup connects to Telegram
         port = int(os.getenv('PORT', 8000))
         logger.info(f"🌐 Starting Telegram Bridge server on port {port}")
         
-        runner = web.AppRunner(app)
         await runner.setup()
         
         site = web.TCPSite(runner, '0.0.0.0', port)
@@ -206,20 +599,24 @@ async def main():
         
         logger.info(f"✅ Telegram Bridge server running on http://0.0.0.0:{port}")
         
-        # Keep the server running
-        try:
-            while True:
-                await asyncio.sleep(3600)  # Sleep for 1 hour
-        except KeyboardInterrupt:
-            logger.info("🛑 Shutting down server...")
-        finally:
-            await bridge.cleanup()
-            await runner.cleanup()
+        # Keep the server running until asked to stop
+        stop_event = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, stop_event.set)
+            except NotImplementedError:
+                # add_signal_handler is not available on Windows
+                pass
+        
+        await stop_event.wait()
+        logger.info("🛑 Shutting down server...")
             
     except Exception as e:
         logger.error(f"❌ Failed to start server: {e}")
-        if bridge:
-            await bridge.cleanup()
+    finally:
+        # Stops listening, drains (on_shutdown), then cleans up (on_cleanup)
+        await runner.cleanup()
 
 if __name__ == '__main__':
     # Create logs directory
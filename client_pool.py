@@ -0,0 +1,162 @@
+"""
+Telegram Client Pool
+Spreads music searches over several Telegram accounts
+"""
+
+import asyncio
+import logging
+import time
+from pathlib import Path
+from telethon.errors import FloodWaitError
+from config import config
+from search_cache import normalize_query
+from telegram_client import TelegramMusicClient
+
+logger = logging.getLogger(__name__)
+
+
+class UnknownAccount(Exception):
+    """Raised for an account that is not part of the pool (any more)"""
+
+
+class AccountUnavailable(Exception):
+    """Raised for a pool account that is currently disconnected"""
+
+
+def discover_sessions():
+    """Session names for every account with a session file in SESSIONS_DIR"""
+    sessions = sorted(Path(config['telegram']['sessions_dir']).glob('*.session'))
+    return [str(path.with_suffix('')) for path in sessions]
+
+
+class TelegramClientPool:
+    """Least-loaded, healthiest-first scheduling over TelegramMusicClients"""
+
+    def __init__(self, session_names=None):
+        session_names = session_names or discover_sessions()
+
+        if session_names:
+            # Pool accounts must already be logged in; flood waits are raised
+            # immediately so the pool can move on to another account
+            flood_sleep_threshold = 0 if len(session_names) > 1 else 60
+            self.accounts = [
+                TelegramMusicClient(name, can_authorize=False, flood_sleep_threshold=flood_sleep_threshold)
+                for name in session_names
+            ]
+        else:
+            self.accounts = [TelegramMusicClient(config['telegram']['session_name'])]
+
+        self.accounts_by_name = {account.name: account for account in self.accounts}
+        self.start_time = time.time()
+
+    @property
+    def primary(self):
+        return self.accounts[0]
+
+    async def connect(self):
+        """Connect every account, failing only if none of them connects"""
+        results = await asyncio.gather(
+            *(account.connect() for account in self.accounts),
+            return_exceptions=True
+        )
+
+        connected = [account.name for account, result in zip(self.accounts, results)
+                     if not isinstance(result, Exception)]
+        if not connected:
+            raise Exception("No Telegram account could connect")
+
+        logger.info(f"👥 Telegram pool ready with {len(connected)}/{len(self.accounts)} accounts")
+
+    def pick_account(self, query, exclude=()):
+        """Choose the account a search should run on, or None"""
+        available = [account for account in self.accounts
+                     if account.is_available() and account.name not in exclude]
+        if not available:
+            return None
+
+        # Join an identical search already in flight on some account
+        key = normalize_query(query)
+        for account in available:
+            if key in account.music_fetcher.inflight_searches:
+                return account
+
+        return min(available, key=lambda x: (x.consecutive_failures, x.active_searches))
+
+    async def search_music(self, query):
+        """Search for music on the best available account"""
+        tried = set()
+        while True:
+            account = self.pick_account(query, exclude=tried)
+            if account is None:
+                raise Exception("No Telegram account available, please retry later")
+            tried.add(account.name)
+
+            try:
+                result = await account.search_music(query)
+            except FloodWaitError as e:
+                account.cool_off(e.seconds)
+                continue
+
+            if result:
+                # Audio can only be fetched through the account that received it
+                result = {
+                    **result,
+                    'account': account.name,
+                    'audio_url': f"{result['audio_url']}?account={account.name}"
+                }
+            return result
+
+    def get_account(self, name=None):
+        """Get an account by name, defaulting to the primary one
+
+        Message IDs only make sense on the account that received them, so
+        there is no falling back to another account.
+        """
+        account = self.accounts_by_name.get(name) if name else self.primary
+        if account is None:
+            raise UnknownAccount(f"Telegram account {name} is not in the pool")
+        if not account.connected:
+            raise AccountUnavailable(f"Telegram account {account.name} is not connected")
+        return account
+
+    async def get_audio_message(self, message_id, account=None):
+        return await self.get_account(account).get_audio_message(message_id)
+
+    def iter_audio(self, message, start=0, stop=None, account=None):
+        return self.get_account(account).iter_audio(message, start, stop)
+
+    async def disconnect(self):
+        await asyncio.gather(*(account.disconnect() for account in self.accounts))
+
+    def is_connected(self):
+        return any(account.is_connected() for account in self.accounts)
+
+    async def get_stats(self):
+        """Get statistics summed over all accounts, plus per-account health"""
+        totals = {
+            'searches_performed': 0,
+            'successful_searches': 0,
+            'failed_searches': 0,
+            'coalesced_searches': 0
+        }
+        for account in self.accounts:
+            account_stats = await account.get_stats()
+            for key in totals:
+                totals[key] += account_stats[key]
+
+        uptime = time.time() - self.start_time
+        return {
+            **totals,
+            'start_time': self.start_time,
+            'uptime_seconds': uptime,
+            'uptime_formatted': self.primary.format_uptime(uptime),
+            'success_rate': (
+                totals['successful_searches'] / totals['searches_performed'] * 100
+                if totals['searches_performed'] > 0 else 0
+            ),
+            'accounts': [account.get_health() for account in self.accounts]
+        }
+
+    async def health_check(self):
+        results = await asyncio.gather(*(account.health_check() for account in self.accounts))
+        return any(results)
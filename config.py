@@ -17,6 +17,7 @@ TELEGRAM_PASSWORD = os.getenv('TELEGRAM_PASSWORD', '')
 
 # Bot Configuration
 VK_MUSIC_BOT = '@vkmusbot'
+WARMUP_BOTS = [VK_MUSIC_BOT]  # resolved at startup so the first search pays no lookup
 SESSION_NAME = 'whatsapp_music_bot'
 SESSIONS_DIR = BASE_DIR / 'sessions'
 
@@ -24,16 +25,43 @@ SESSIONS_DIR = BASE_DIR / 'sessions'
 SEARCH_TIMEOUT = 30  # seconds
 MAX_CONCURRENT_SEARCHES = 10
 SEARCH_RATE_LIMIT = 5  # searches per minute per IP
+SEARCH_RATE_BURST = int(os.getenv('SEARCH_RATE_BURST', SEARCH_RATE_LIMIT))
+SEARCH_QUEUE_SIZE = int(os.getenv('SEARCH_QUEUE_SIZE', 50))  # searches waiting for a slot
+SEARCH_QUEUE_TIMEOUT = 10  # seconds a search may wait for a slot
+SEARCH_BATCH_MAX_QUERIES = 100
+SEARCH_BATCH_CONCURRENCY = 5  # searches in flight per batch request
+SEARCH_BATCH_RATE_LIMIT = 2  # batch requests per minute per IP, whatever their size
+
+# Search Cache Configuration
+SEARCH_CACHE_TTL = int(os.getenv('SEARCH_CACHE_TTL', 6 * 3600))  # seconds
+SEARCH_CACHE_NEGATIVE_TTL = int(os.getenv('SEARCH_CACHE_NEGATIVE_TTL', 600))  # seconds
+SEARCH_CACHE_MAX_ENTRIES = int(os.getenv('SEARCH_CACHE_MAX_ENTRIES', 5000))
+SEARCH_CACHE_DB = os.getenv('SEARCH_CACHE_DB', '')  # empty keeps the cache in memory only
+
+# Prefetch Configuration
+PREFETCH_ENABLED = os.getenv('PREFETCH_ENABLED', 'False').lower() == 'true'  # spends the bot search budget
+PREFETCH_INTERVAL = int(os.getenv('PREFETCH_INTERVAL', 900))  # seconds between runs
+PREFETCH_TOP_K = int(os.getenv('PREFETCH_TOP_K', 50))
+PREFETCH_RATE_LIMIT = 2  # prefetch searches per minute
+PREFETCH_DOWNLOAD_AUDIO = os.getenv('PREFETCH_DOWNLOAD_AUDIO', 'False').lower() == 'true'  # and disk
 
 # File Configuration
 MAX_FILE_SIZE = 50 * 1024 * 1024  # 50MB
 ALLOWED_AUDIO_FORMATS = ['.mp3', '.m4a', '.ogg', '.wav']
 TEMP_DIR = BASE_DIR / 'temp'
 
+# Audio Cache Configuration
+AUDIO_CACHE_DIR = TEMP_DIR / 'audio'
+AUDIO_CACHE_MAX_BYTES = int(os.getenv('AUDIO_CACHE_MAX_BYTES', 2 * 1024 * 1024 * 1024))  # 2GB
+AUDIO_CACHE_POLICY = os.getenv('AUDIO_CACHE_POLICY', 'lru')  # 'lru' or 'lfu'
+
 # Server Configuration
 SERVER_HOST = '0.0.0.0'
 SERVER_PORT = int(os.getenv('PORT', 8000))
 DEBUG = os.getenv('DEBUG', 'False').lower() == 'true'
+SHUTDOWN_DRAIN_TIMEOUT = int(os.getenv('SHUTDOWN_DRAIN_TIMEOUT', 30))  # seconds
+# Peers allowed to name the end client in X-Client-Id (e.g. the bot in front of the bridge)
+TRUSTED_PROXIES = frozenset(ip.strip() for ip in os.getenv('TRUSTED_PROXIES', '').split(',') if ip.strip())
 
 # Logging Configuration
 LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
@@ -76,17 +104,41 @@ config = {
         'api_hash': TELEGRAM_API_HASH,
         'phone': TELEGRAM_PHONE,
         'session_name': SESSION_NAME,
-        'vk_bot': VK_MUSIC_BOT
+        'sessions_dir': SESSIONS_DIR,
+        'vk_bot': VK_MUSIC_BOT,
+        'warmup_bots': WARMUP_BOTS
     },
     'search': {
         'timeout': SEARCH_TIMEOUT,
         'max_concurrent': MAX_CONCURRENT_SEARCHES,
-        'rate_limit': SEARCH_RATE_LIMIT
+        'rate_limit': SEARCH_RATE_LIMIT,
+        'rate_window': RATE_LIMIT_WINDOW,
+        'rate_burst': SEARCH_RATE_BURST,
+        'queue_size': SEARCH_QUEUE_SIZE,
+        'queue_timeout': SEARCH_QUEUE_TIMEOUT,
+        'batch_max_queries': SEARCH_BATCH_MAX_QUERIES,
+        'batch_concurrency': SEARCH_BATCH_CONCURRENCY,
+        'batch_rate_limit': SEARCH_BATCH_RATE_LIMIT
+    },
+    'cache': {
+        'ttl': SEARCH_CACHE_TTL,
+        'negative_ttl': SEARCH_CACHE_NEGATIVE_TTL,
+        'max_entries': SEARCH_CACHE_MAX_ENTRIES,
+        'db_path': SEARCH_CACHE_DB
+    },
+    'prefetch': {
+        'enabled': PREFETCH_ENABLED,
+        'interval': PREFETCH_INTERVAL,
+        'top_k': PREFETCH_TOP_K,
+        'rate_limit': PREFETCH_RATE_LIMIT,
+        'download_audio': PREFETCH_DOWNLOAD_AUDIO
     },
     'server': {
         'host': SERVER_HOST,
         'port': SERVER_PORT,
-        'debug': DEBUG
+        'debug': DEBUG,
+        'drain_timeout': SHUTDOWN_DRAIN_TIMEOUT,
+        'trusted_proxies': TRUSTED_PROXIES
     },
     'logging': {
         'level': LOG_LEVEL,
@@ -97,7 +149,10 @@ config = {
     'files': {
         'max_size': MAX_FILE_SIZE,
         'allowed_formats': ALLOWED_AUDIO_FORMATS,
-        'temp_dir': TEMP_DIR
+        'temp_dir': TEMP_DIR,
+        'audio_cache_dir': AUDIO_CACHE_DIR,
+        'audio_cache_max_bytes': AUDIO_CACHE_MAX_BYTES,
+        'audio_cache_policy': AUDIO_CACHE_POLICY
     },
     'performance': {
         'async_timeout': ASYNC_TIMEOUT,
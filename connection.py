@@ -287,16 +287,17 @@ class Connection(abc.ABC):
                     # * ConnectionResetError
                     self._log.info('%s during disconnect: %s', type(e), e)
 
-    def send(self, data):
+    def send(self, *packets):
         """
-        Sends a packet of data through this connection mode.
+        Sends one or more packets of data through this connection mode.
+        Several packets are written to the transport at once.
 
         This method returns a coroutine.
         """
         if not self._connected:
             raise ConnectionError('Not connected')
 
-        return self._send_queue.put(data)
+        return self._send_queue.put(packets)
 
     async def recv(self):
         """
@@ -319,7 +320,7 @@ class Connection(abc.ABC):
         """
         try:
             while self._connected:
-                self._send(await self._send_queue.get())
+                self._send_many(await self._send_queue.get())
                 await self._writer.drain()
         except asyncio.CancelledError:
             pass
@@ -376,6 +377,12 @@ class Connection(abc.ABC):
     def _send(self, data):
         self._writer.write(self._codec.encode_packet(data))
 
+    def _send_many(self, packets):
+        if len(packets) == 1:
+            self._send(packets[0])
+        else:
+            self._writer.write(b''.join(map(self._codec.encode_packet, packets)))
+
     async def _recv(self):
         return await self._codec.read_packet(self._reader)
 
@@ -402,6 +409,13 @@ class ObfuscatedConnection(Connection):
     def _send(self, data):
         self._obfuscation.write(self._codec.encode_packet(data))
 
+    def _send_many(self, packets):
+        if len(packets) == 1:
+            self._send(packets[0])
+        else:
+            self._obfuscation.write(
+                b''.join(map(self._codec.encode_packet, packets)))
+
     async def _recv(self):
         return await self._codec.read_packet(self._obfuscation)
 
@@ -1,7 +1,9 @@
+import collections
 import datetime
 import io
 import os
 import pathlib
+import time
 import typing
 import inspect
 import asyncio
@@ -49,7 +51,7 @@ class _DirectDownloadIter(RequestIter):
         self._chunk_size = chunk_size
         self._last_part = None
         self._msg_data = msg_data
-        self._timed_out = False
+        self._controller = None
         
         self._exported = dc_id and self._client.session.dc_id != dc_id
         if not self._exported:
@@ -81,42 +83,45 @@ class _DirectDownloadIter(RequestIter):
         else:
             self.request.offset += self._stride
 
-    async def _request(self):
+    async def _request(self, request=None, timed_out=False):
+        # ``request`` lets several parts be in flight at different offsets,
+        # so whether it already timed out is tracked per call, not per iterator
+        request = request or self.request
         try:
-            result = await self._client._call(self._sender, self.request)
-            self._timed_out = False
+            result = await self._client._call(self._sender, request)
             if isinstance(result, types.upload.FileCdnRedirect):
                 if self.client._mb_entity_cache.self_bot:
                     raise ValueError('FileCdnRedirect but the GetCdnFileRequest API access for bot users is restricted. Try to change api_id to avoid FileCdnRedirect')
                 raise _CdnRedirect(result)
             if isinstance(result, types.upload.CdnFileReuploadNeeded):
                 await self.client._call(self.client._sender, functions.upload.ReuploadCdnFileRequest(file_token=self._cdn_redirect.file_token, request_token=result.request_token))
-                result = await self._client._call(self._sender, self.request)
+                result = await self._client._call(self._sender, request)
                 return result.bytes
             else:
                 return result.bytes
 
         except errors.TimedOutError as e:
-            if self._timed_out:
+            if timed_out:
                 self.client._log[__name__].warning('Got two timeouts in a row while downloading file')
                 raise
 
-            self._timed_out = True
+            if self._controller:
+                self._controller.failed()
             self.client._log[__name__].info('Got timeout while downloading file, retrying once')
             await asyncio.sleep(TIMED_OUT_SLEEP)
-            return await self._request()
+            return await self._request(request, timed_out=True)
 
         except errors.FileMigrateError as e:
             self.client._log[__name__].info('File lives in another DC')
             self._sender = await self.client._borrow_exported_sender(e.new_dc)
             self._exported = True
-            return await self._request()
+            return await self._request(request, timed_out)
 
         except (errors.FilerefUpgradeNeededError, errors.FileReferenceExpiredError) as e:
             # Only implemented for documents which are the ones that may take that long to download
             if not self._msg_data \
-                    or not isinstance(self.request.location, types.InputDocumentFileLocation) \
-                    or self.request.location.thumb_size != '':
+                    or not isinstance(request.location, types.InputDocumentFileLocation) \
+                    or request.location.thumb_size != '':
                 raise
 
             self.client._log[__name__].info('File ref expired during download; refetching message')
@@ -129,11 +134,11 @@ class _DirectDownloadIter(RequestIter):
             document = msg.media.document
 
             # Message media may have been edited for something else
-            if document.id != self.request.location.id:
+            if document.id != request.location.id:
                 raise
 
-            self.request.location.file_reference = document.file_reference
-            return await self._request()
+            request.location.file_reference = document.file_reference
+            return await self._request(request, timed_out)
 
     async def close(self):
         if not self._sender:
@@ -160,7 +165,8 @@ class _DirectDownloadIter(RequestIter):
 class _GenericDownloadIter(_DirectDownloadIter):
     async def _load_next_chunk(self):
         # 1. Fetch enough for one chunk
-        data = b''
+        #    (into a ``bytearray`` so each part is appended, not re-copied)
+        data = bytearray()
 
         # 1.1. ``bad`` is how much into the data we have we need to offset
         bad = self.request.offset % self.request.limit
@@ -208,6 +214,94 @@ class _GenericDownloadIter(_DirectDownloadIter):
             self.request.offset -= self._stride
 
 
+class _ParallelDownloadIter(_DirectDownloadIter):
+    """
+    Like `_DirectDownloadIter`, but keeps up to ``parallel`` parts in flight
+    on the sender at once. Parts may complete in any order; they are yielded
+    in file order.
+
+    With a ``controller`` (`utils._TransferController`), both the part size
+    and the amount of parts in flight follow what it measures instead, and
+    chunks are as large as the part they come from.
+    """
+    async def _init(self, parallel, controller, **kwargs):
+        await super()._init(**kwargs)
+        self._parallel = parallel
+        self._controller = controller
+        self._pending = collections.deque()
+        self._first = True
+
+    def _request_at(self, offset, limit):
+        if self._cdn_redirect is not None:
+            return functions.upload.GetCdnFileRequest(
+                self.request.file_token, offset=offset, limit=limit)
+        return functions.upload.GetFileRequest(
+            self.request.location, offset=offset, limit=limit)
+
+    async def _request_part(self, request, in_flight):
+        start = time.monotonic()
+        cur = await self._request(request)
+        if self._controller:
+            self._controller.observe(len(cur), time.monotonic() - start, in_flight)
+        return cur
+
+    async def _load_next_chunk(self):
+        if self._first:
+            # The first part is fetched alone so ``FileMigrateError`` and CDN
+            # redirects are dealt with once, before other requests are sent
+            self._first = False
+            start = time.monotonic()
+            await super()._load_next_chunk()
+            if self._controller and self.buffer:
+                self._controller.observe(len(self.buffer[0]), time.monotonic() - start, 1)
+            return
+
+        window = self._controller.window if self._controller else self._parallel
+
+        # ``left`` counts the parts in flight too, so nothing past it is requested
+        while len(self._pending) < min(window, self.left) \
+                and (self.total is None or self.request.offset < self.total):
+            if self._controller:
+                limit = stride = self._controller.part_size_at(self.request.offset)
+            else:
+                limit, stride = self.request.limit, self._stride
+
+            request = self._request_at(self.request.offset, limit)
+            self._pending.append((asyncio.ensure_future(
+                self._request_part(request, len(self._pending) + 1)), request))
+            self.request.offset += stride
+
+        if not self._pending:
+            # The previous part ended exactly at the end of the file
+            self.left = 0
+            await self.close()
+            return
+
+        task, request = self._pending.popleft()
+        try:
+            cur = await task
+        except BaseException:
+            self._cancel_pending()
+            raise
+
+        self.buffer.append(cur)
+        if len(cur) < request.limit:
+            self.left = len(self.buffer)
+            await self.close()
+
+    def _cancel_pending(self):
+        for task, _ in self._pending:
+            if task.done() and not task.cancelled():
+                task.exception()  # Retrieved so it is not reported as unhandled
+            else:
+                task.cancel()
+        self._pending.clear()
+
+    async def close(self):
+        self._cancel_pending()
+        await super().close()
+
+
 class DownloadMethods:
 
     # region Public methods
@@ -457,7 +551,9 @@ class DownloadMethods:
             progress_callback: 'hints.ProgressCallback' = None,
             dc_id: int = None,
             key: bytes = None,
-            iv: bytes = None) -> typing.Optional[bytes]:
+            iv: bytes = None,
+            parallel: int = 1,
+            adaptive: bool = False) -> typing.Optional[bytes]:
         """
         Low-level method to download files from their input location.
 
@@ -502,6 +598,17 @@ class DownloadMethods:
             iv ('bytes', optional):
                 In case of an encrypted upload (secret chats) an iv is supplied
 
+            parallel (`int`, optional):
+                How many parts may be requested at the same time. Large
+                files download faster with a few parts in flight, instead
+                of waiting one round-trip per part. By default, parts are
+                requested one after another.
+
+            adaptive (`bool`, optional):
+                Whether the part size and the parts in flight should adapt
+                to the round-trip time and bandwidth measured on the data
+                center, instead of using ``parallel``. Ignored if a
+                ``part_size_kb`` is given or the file is encrypted.
 
         Example
             .. code-block:: python
@@ -519,6 +626,8 @@ class DownloadMethods:
             dc_id=dc_id,
             key=key,
             iv=iv,
+            parallel=parallel,
+            adaptive=adaptive,
         )
 
     async def _download_file(
@@ -533,8 +642,13 @@ class DownloadMethods:
             key: bytes = None,
             iv: bytes = None,
             msg_data: tuple = None,
-            cdn_redirect: types.upload.FileCdnRedirect = None
+            cdn_redirect: types.upload.FileCdnRedirect = None,
+            parallel: int = 1,
+            adaptive: bool = False
     ) -> typing.Optional[bytes]:
+        # Encrypted files are decrypted per chunk, so their chunks can't vary
+        adaptive = adaptive and not part_size_kb and not (key and iv)
+
         if not part_size_kb:
             if not file_size:
                 part_size_kb = 64  # Reasonable default
@@ -561,7 +675,8 @@ class DownloadMethods:
 
         try:
             async for chunk in self._iter_download(
-                    input_location, request_size=part_size, dc_id=dc_id, msg_data=msg_data, cdn_redirect=cdn_redirect):
+                    input_location, request_size=part_size, dc_id=dc_id, msg_data=msg_data, cdn_redirect=cdn_redirect,
+                    parallel=parallel, adaptive=adaptive):
                 if iv and key:
                     chunk = AES.decrypt_ige(chunk, key, iv)
                 r = f.write(chunk)
@@ -591,7 +706,9 @@ class DownloadMethods:
               key=e.cdn_redirect.encryption_key,
               iv=e.cdn_redirect.encryption_iv,
               msg_data=msg_data,
-              cdn_redirect=e.cdn_redirect
+              cdn_redirect=e.cdn_redirect,
+              parallel=parallel,
+              adaptive=adaptive
           )
         finally:
             if isinstance(file, str) or in_memory:
@@ -607,7 +724,8 @@ class DownloadMethods:
             chunk_size: int = None,
             request_size: int = MAX_CHUNK_SIZE,
             file_size: int = None,
-            dc_id: int = None
+            dc_id: int = None,
+            parallel: int = 1
     ):
         """
         Iterates over a file download, yielding chunks of the file.
@@ -668,6 +786,12 @@ class DownloadMethods:
                 The data center the library should connect to in order
                 to download the file. You shouldn't worry about this.
 
+            parallel (`int`, optional):
+                How many requests may be in flight at the same time.
+                Chunks are still yielded in order. Only used when the
+                download can be done directly (see the note above);
+                defaults to 1.
+
         Yields
 
             `bytes` objects representing the chunks of the file if the
@@ -701,6 +825,7 @@ class DownloadMethods:
             request_size=request_size,
             file_size=file_size,
             dc_id=dc_id,
+            parallel=parallel,
         )
 
     def _iter_download(
@@ -715,7 +840,9 @@ class DownloadMethods:
             file_size: int = None,
             dc_id: int = None,
             msg_data: tuple = None,
-            cdn_redirect: types.upload.FileCdnRedirect = None
+            cdn_redirect: types.upload.FileCdnRedirect = None,
+            parallel: int = 1,
+            adaptive: bool = False
     ):
         info = utils._get_file_info(file)
         if info.dc_id is not None:
@@ -726,10 +853,20 @@ class DownloadMethods:
 
         file = info.location
 
+        # Adapting only works if the caller doesn't rely on the chunks' size
+        adaptive = adaptive and chunk_size is None and stride is None \
+            and limit is None and offset % MIN_CHUNK_SIZE == 0
+
+        controller = None
+        if adaptive:
+            controller = self._transfer_controllers.setdefault(
+                dc_id or self.session.dc_id, utils._TransferController())
+            request_size = controller.part_size_at(offset)
+
         if chunk_size is None:
             chunk_size = request_size
 
-        if limit is None and file_size is not None:
+        if limit is None and file_size is not None and not adaptive:
             limit = (file_size + chunk_size - 1) // chunk_size
 
         if stride is None:
@@ -743,13 +880,27 @@ class DownloadMethods:
         elif request_size > MAX_CHUNK_SIZE:
             request_size = MAX_CHUNK_SIZE
 
+        kwargs = {}
         if chunk_size == request_size \
                 and offset % MIN_CHUNK_SIZE == 0 \
                 and stride % MIN_CHUNK_SIZE == 0 \
                 and (limit is None or offset % limit == 0):
-            cls = _DirectDownloadIter
-            self._log[__name__].info('Starting direct file download in chunks of '
-                                     '%d at %d, stride %d', request_size, offset, stride)
+            if adaptive:
+                cls = _ParallelDownloadIter
+                kwargs = {'parallel': controller.window, 'controller': controller}
+                self._log[__name__].info('Starting adaptive file download in chunks of '
+                                         '%d at %d, %d in flight',
+                                         request_size, offset, controller.window)
+            elif parallel > 1:
+                cls = _ParallelDownloadIter
+                kwargs = {'parallel': parallel, 'controller': None}
+                self._log[__name__].info('Starting parallel file download in chunks of '
+                                         '%d at %d, stride %d, %d in flight',
+                                         request_size, offset, stride, parallel)
+            else:
+                cls = _DirectDownloadIter
+                self._log[__name__].info('Starting direct file download in chunks of '
+                                         '%d at %d, stride %d', request_size, offset, stride)
         else:
             cls = _GenericDownloadIter
             self._log[__name__].info('Starting indirect file download in chunks of '
@@ -766,7 +917,8 @@ class DownloadMethods:
             request_size=request_size,
             file_size=file_size,
             msg_data=msg_data,
-            cdn_redirect=cdn_redirect
+            cdn_redirect=cdn_redirect,
+            **kwargs
         )
 
     # endregion
@@ -1,5 +1,5 @@
 """
-Helper module around the system's libssl library if available for IGE mode.
+Helper module around the system's libssl library if available for IGE and CTR modes.
 """
 import ctypes
 import ctypes.util
@@ -82,6 +82,7 @@ except OSError as e:
 if not _libssl:
     decrypt_ige = None
     encrypt_ige = None
+    CTR = None
 else:
     # https://github.com/openssl/openssl/blob/master/include/openssl/aes.h
     AES_ENCRYPT = ctypes.c_int(1)
@@ -102,7 +103,7 @@ else:
         iv = (ctypes.c_ubyte * len(iv))(*iv)
 
         in_len = ctypes.c_size_t(len(cipher_text))
-        in_ptr = (ctypes.c_ubyte * len(cipher_text))(*cipher_text)
+        in_ptr = (ctypes.c_ubyte * len(cipher_text)).from_buffer_copy(cipher_text)
         out_ptr = (ctypes.c_ubyte * len(cipher_text))()
 
         _libssl.AES_set_decrypt_key(key, key_len, ctypes.byref(aes_key))
@@ -124,7 +125,7 @@ else:
         iv = (ctypes.c_ubyte * len(iv))(*iv)
 
         in_len = ctypes.c_size_t(len(plain_text))
-        in_ptr = (ctypes.c_ubyte * len(plain_text))(*plain_text)
+        in_ptr = (ctypes.c_ubyte * len(plain_text)).from_buffer_copy(plain_text)
         out_ptr = (ctypes.c_ubyte * len(plain_text))()
 
         _libssl.AES_set_encrypt_key(key, key_len, ctypes.byref(aes_key))
@@ -138,3 +139,54 @@ else:
         )
 
         return bytes(out_ptr)
+
+    # CTR goes through the EVP interface, which (unlike the deprecated
+    # AES_ctr128_encrypt) exists on every OpenSSL still in use and picks
+    # the AES-NI implementation when the CPU has it
+    _EVP_CIPHERS = {16: 'EVP_aes_128_ctr', 24: 'EVP_aes_192_ctr', 32: 'EVP_aes_256_ctr'}
+
+    try:
+        for _name in _EVP_CIPHERS.values():
+            getattr(_libssl, _name).restype = ctypes.c_void_p
+
+        _libssl.EVP_CIPHER_CTX_new.restype = ctypes.c_void_p
+        _libssl.EVP_CIPHER_CTX_free.argtypes = [ctypes.c_void_p]
+        _libssl.EVP_EncryptInit_ex.argtypes = [
+            ctypes.c_void_p, ctypes.c_void_p, ctypes.c_void_p,
+            ctypes.c_char_p, ctypes.c_char_p
+        ]
+        _libssl.EVP_EncryptUpdate.argtypes = [
+            ctypes.c_void_p, ctypes.c_char_p, ctypes.POINTER(ctypes.c_int),
+            ctypes.c_char_p, ctypes.c_int
+        ]
+    except AttributeError as e:
+        __log__.info('SSL library has no EVP AES-CTR: %s', e)
+        CTR = None
+    else:
+        class CTR:
+            """Stateful AES CTR stream, as successive calls continue the keystream"""
+
+            def __init__(self, key, iv):
+                self._ctx = _libssl.EVP_CIPHER_CTX_new()
+                if not self._ctx:
+                    raise MemoryError('EVP_CIPHER_CTX_new failed')
+
+                cipher = getattr(_libssl, _EVP_CIPHERS[len(key)])()
+                if not _libssl.EVP_EncryptInit_ex(self._ctx, cipher, None, key, iv):
+                    raise ValueError('EVP_EncryptInit_ex failed')
+
+            def encrypt(self, data):
+                data = bytes(data)
+                out = ctypes.create_string_buffer(len(data))
+                out_len = ctypes.c_int()
+                _libssl.EVP_EncryptUpdate(
+                    self._ctx, out, ctypes.byref(out_len), data, len(data))
+                return out.raw  # CTR never buffers, so all of it was written
+
+            # Encrypting and decrypting are the same in CTR mode
+            decrypt = encrypt
+
+            def __del__(self):
+                if getattr(self, '_ctx', None):
+                    _libssl.EVP_CIPHER_CTX_free(self._ctx)
+                    self._ctx = None
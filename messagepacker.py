@@ -1,12 +1,19 @@
 import asyncio
 import collections
-import io
 import struct
 
 from ..tl import TLRequest
 from ..tl.core.messagecontainer import MessageContainer
 from ..tl.core.tlmessage import TLMessage
 
+# Every batch is built in a single buffer which starts with room for the salt
+# and session ID (filled when encrypting), then for the header of the container
+# message and the container's own header, so nothing needs to be copied around
+_SALT_SESSION_SIZE = 16
+_MESSAGE_HEADER_SIZE = 16
+_CONTAINER_HEADER_SIZE = 8
+_RESERVED_SIZE = _SALT_SESSION_SIZE + _MESSAGE_HEADER_SIZE + _CONTAINER_HEADER_SIZE
+
 
 class MessagePacker:
     """
@@ -42,12 +49,22 @@ class MessagePacker:
 
         If the cancellation occurs or only invalid items were in the
         queue, (None, None) will be returned instead.
+
+        The data is a `bytearray` whose first 16 bytes are left for
+        `MTProtoState.encrypt_message_buffer` to fill.
         """
         if not self._deque:
             self._ready.clear()
             await self._ready.wait()
 
-        buffer = io.BytesIO()
+        return self.get_nowait()
+
+    def get_nowait(self):
+        """
+        Like `get`, but returns (None, None) straight away if nothing
+        is queued instead of waiting for more items.
+        """
+        buffer = bytearray(_RESERVED_SIZE)
         batch = []
         size = 0
 
@@ -96,16 +113,19 @@ class MessagePacker:
             return None, None
 
         if len(batch) > 1:
-            # Inlined code to pack several messages into a container
-            data = struct.pack(
-                '<Ii', MessageContainer.CONSTRUCTOR_ID, len(batch)
-            ) + buffer.getvalue()
-            buffer = io.BytesIO()
-            container_id = self._state.write_data_as_message(
-                buffer, data, content_related=False
+            # Fill the container headers reserved at the start of the buffer
+            offset = _SALT_SESSION_SIZE + _MESSAGE_HEADER_SIZE
+            struct.pack_into('<Ii', buffer, offset,
+                             MessageContainer.CONSTRUCTOR_ID, len(batch))
+            container_id = self._state.write_message_header(
+                buffer, _SALT_SESSION_SIZE, len(buffer) - offset,
+                content_related=False
             )
             for s in batch:
                 s.container_id = container_id
+        else:
+            # No container, so the message goes right after the salt and
+            # session ID. Deleting from the front of a bytearray is cheap.
+            del buffer[:_MESSAGE_HEADER_SIZE + _CONTAINER_HEADER_SIZE]
 
-        data = buffer.getvalue()
-        return batch, data
+        return batch, buffer
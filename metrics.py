@@ -0,0 +1,135 @@
+"""
+Metrics
+Prometheus-style latency histograms for the Telegram bridge
+"""
+
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+from aiohttp import TraceConfig, web
+
+# Upper bounds in seconds, from cache hits to slow bot replies
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+class Histogram:
+    """Cumulative histogram with one series per label value tuple"""
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        # label values -> [bucket counts..., +Inf count, sum]
+        self.series = {}
+
+    def observe(self, value, *labelvalues):
+        series = self.series.get(labelvalues)
+        if series is None:
+            series = self.series[labelvalues] = [0] * (len(self.buckets) + 1) + [0.0]
+
+        # Counts are per bucket here and made cumulative when rendered
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def render(self):
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} histogram"
+        ]
+        for labelvalues, series in sorted(self.series.items()):
+            labels = ','.join(f'{name}="{value}"' for name, value in zip(self.labelnames, labelvalues))
+            prefix = f"{labels}," if labels else ''
+
+            cumulative = 0
+            for bound, count in zip(self.buckets + ('+Inf',), series):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{prefix}le="{bound}"}} {cumulative}')
+
+            suffix = f"{{{labels}}}" if labels else ''
+            lines.append(f"{self.name}_sum{suffix} {series[-1]}")
+            lines.append(f"{self.name}_count{suffix} {cumulative}")
+        return '\n'.join(lines)
+
+
+class MetricsRegistry:
+    """Holds every histogram exposed on /metrics"""
+
+    def __init__(self):
+        self.histograms = []
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        histogram = Histogram(name, documentation, labelnames, buckets)
+        self.histograms.append(histogram)
+        return histogram
+
+    def render(self):
+        return '\n'.join(histogram.render() for histogram in self.histograms) + '\n'
+
+
+registry = MetricsRegistry()
+
+stage_seconds = registry.histogram(
+    'bridge_stage_seconds',
+    'Time spent in each stage of a search or audio transfer',
+    ['stage']
+)
+http_request_seconds = registry.histogram(
+    'bridge_http_request_seconds',
+    'Time to answer HTTP requests served by the bridge',
+    ['method', 'route', 'status']
+)
+telegram_request_seconds = registry.histogram(
+    'bridge_telegram_request_seconds',
+    'Round-trip time of Telegram API requests',
+    ['request']
+)
+http_client_seconds = registry.histogram(
+    'bridge_http_client_seconds',
+    'Round-trip time of outgoing HTTP requests',
+    ['method', 'host']
+)
+
+
+@contextmanager
+def time_stage(stage):
+    """Observe how long the block takes under the given stage label"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        stage_seconds.observe(time.perf_counter() - start, stage)
+
+
+@web.middleware
+async def metrics_middleware(request, handler):
+    """Time every request by its route pattern, not its concrete path"""
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await handler(request)
+        status = response.status
+        return response
+    except web.HTTPException as e:
+        status = e.status
+        raise
+    finally:
+        resource = request.match_info.route.resource
+        route = resource.canonical if resource else 'unmatched'
+        http_request_seconds.observe(time.perf_counter() - start, request.method, route, str(status))
+
+
+def client_trace_config():
+    """TraceConfig timing requests made through an aiohttp ClientSession"""
+    async def on_request_start(session, context, params):
+        context.start = time.perf_counter()
+
+    async def on_request_end(session, context, params):
+        http_client_seconds.observe(time.perf_counter() - context.start, params.method, params.url.host)
+
+    trace_config = TraceConfig()
+    trace_config.on_request_start.append(on_request_start)
+    trace_config.on_request_end.append(on_request_end)
+    return trace_config
+
@@ -26,9 +26,47 @@ from ..tl.types import (
     DestroyAuthKeyOk, DestroyAuthKeyNone, DestroyAuthKeyFail
 )
 from ..tl import types as _tl
-from ..crypto import AuthKey
+from ..crypto import AES, AuthKey
 from ..helpers import retry_range
 
+# Batches which are ready at the same time are written together, up to
+# about this many bytes (a single batch can be up to 1MB on its own)
+MAX_COALESCED_SIZE = 1024 * 1024
+
+# Packets waiting between the stages of the receive pipeline. Once these fill
+# up, the socket isn't read from until the later stages catch up.
+RECV_QUEUE_SIZE = 16
+
+# Packets at least this big (like file parts) are decrypted in a worker thread
+# when the AES implementation allows other threads to run meanwhile
+THREADED_DECRYPT_SIZE = 64 * 1024
+
+
+class _StageStats:
+    """Time spent by incoming packets in one stage of the receive pipeline"""
+
+    def __init__(self):
+        self.count = 0
+        self.queued = 0.0  # Seconds spent waiting for the stage to pick them
+        self.busy = 0.0  # Seconds spent by the stage working on them
+        self.max_busy = 0.0
+
+    def add(self, queued, busy):
+        self.count += 1
+        self.queued += queued
+        self.busy += busy
+        if busy > self.max_busy:
+            self.max_busy = busy
+
+    def to_dict(self):
+        count = self.count or 1
+        return {
+            'count': self.count,
+            'avg_queued_ms': self.queued * 1000 / count,
+            'avg_busy_ms': self.busy * 1000 / count,
+            'max_busy_ms': self.max_busy * 1000
+        }
+
 
 class MTProtoSender:
     """
@@ -76,6 +114,19 @@ class MTProtoSender:
         # We need to join the loops upon disconnection
         self._send_loop_handle = None
         self._recv_loop_handle = None
+        self._decrypt_loop_handle = None
+        self._dispatch_loop_handle = None
+
+        # Incoming packets go from the receive loop to the decrypt loop
+        # and then to the dispatch loop through these, which are created
+        # anew on every connection so no stale packets are left behind
+        self._decrypt_queue = None
+        self._dispatch_queue = None
+        self._recv_stats = {
+            'read': _StageStats(),
+            'decrypt': _StageStats(),
+            'dispatch': _StageStats()
+        }
 
         # Preserving the references of the AuthKey and state is important
         self.auth_key = auth_key or AuthKey(None)
@@ -217,6 +268,17 @@ class MTProtoSender:
         """
         return asyncio.shield(self._disconnected)
 
+    def receive_stats(self):
+        """
+        Returns how long incoming packets spent in each stage of the
+        receive pipeline (``'read'``, ``'decrypt'`` and ``'dispatch'``)
+        and waiting for it, in milliseconds.
+
+        For the read stage, the busy time is how long reading had to
+        wait for the decrypt stage to accept another packet.
+        """
+        return {name: stats.to_dict() for name, stats in self._recv_stats.items()}
+
     # Private methods
 
     async def _connect(self):
@@ -267,8 +329,12 @@ class MTProtoSender:
         self._log.debug('Starting send loop')
         self._send_loop_handle = loop.create_task(self._send_loop())
 
-        self._log.debug('Starting receive loop')
+        self._log.debug('Starting receive loops')
+        self._decrypt_queue = asyncio.Queue(RECV_QUEUE_SIZE)
+        self._dispatch_queue = asyncio.Queue(RECV_QUEUE_SIZE)
         self._recv_loop_handle = loop.create_task(self._recv_loop())
+        self._decrypt_loop_handle = loop.create_task(self._decrypt_loop())
+        self._dispatch_loop_handle = loop.create_task(self._dispatch_loop())
 
         # _disconnected only completes after manual disconnection
         # or errors after which the sender cannot continue such
@@ -333,7 +399,9 @@ class MTProtoSender:
             await helpers._cancel(
                 self._log,
                 send_loop_handle=self._send_loop_handle,
-                recv_loop_handle=self._recv_loop_handle
+                recv_loop_handle=self._recv_loop_handle,
+                decrypt_loop_handle=self._decrypt_loop_handle,
+                dispatch_loop_handle=self._dispatch_loop_handle
             )
 
             self._log.info('Disconnection from %s complete!', self._connection)
@@ -355,7 +423,9 @@ class MTProtoSender:
         await helpers._cancel(
             self._log,
             send_loop_handle=self._send_loop_handle,
-            recv_loop_handle=self._recv_loop_handle
+            recv_loop_handle=self._recv_loop_handle,
+            decrypt_loop_handle=self._decrypt_loop_handle,
+            dispatch_loop_handle=self._dispatch_loop_handle
         )
 
         # TODO See comment in `_start_reconnect`
@@ -458,49 +528,67 @@ class MTProtoSender:
                 self._pending_ack.clear()
 
             self._log.debug('Waiting for messages to send...')
-            # TODO Wait for the connection send queue to be empty?
-            # This means that while it's not empty we can wait for
-            # more messages to be added to the send queue.
             batch, data = await self._send_queue.get()
 
             if not data:
                 continue
 
-            self._log.debug('Encrypting %d message(s) in %d bytes for sending',
-                            len(batch), len(data))
-
-            data = self._state.encrypt_message_data(data)
+            # While the connection was busy writing the previous packets,
+            # more batches may have piled up. They're all encrypted now and
+            # handed over together so they go out in a single write.
+            packets = []
+            size = 0
+            while True:
+                self._log.debug('Encrypting %d message(s) in %d bytes for sending',
+                                len(batch), len(data))
+
+                data = self._state.encrypt_message_buffer(data)
+                packets.append(data)
+                size += len(data)
+
+                # Whether sending succeeds or not, the popped requests are now
+                # pending because they're removed from the queue. If a reconnect
+                # occurs, they will be removed from pending state and re-enqueued
+                # so even if the network fails they won't be lost. If they were
+                # never re-enqueued, the future waiting for a response "locks".
+                for state in batch:
+                    if not isinstance(state, list):
+                        if isinstance(state.request, TLRequest):
+                            self._pending_state[state.msg_id] = state
+                    else:
+                        for s in state:
+                            if isinstance(s.request, TLRequest):
+                                self._pending_state[s.msg_id] = s
+
+                if size >= MAX_COALESCED_SIZE:
+                    break
 
-            # Whether sending succeeds or not, the popped requests are now
-            # pending because they're removed from the queue. If a reconnect
-            # occurs, they will be removed from pending state and re-enqueued
-            # so even if the network fails they won't be lost. If they were
-            # never re-enqueued, the future waiting for a response "locks".
-            for state in batch:
-                if not isinstance(state, list):
-                    if isinstance(state.request, TLRequest):
-                        self._pending_state[state.msg_id] = state
-                else:
-                    for s in state:
-                        if isinstance(s.request, TLRequest):
-                            self._pending_state[s.msg_id] = s
+                batch, data = self._send_queue.get_nowait()
+                if not data:
+                    break
 
             try:
-                await self._connection.send(data)
+                await self._connection.send(*packets)
             except IOError as e:
                 self._log.info('Connection closed while sending data')
                 self._start_reconnect(e)
                 return
 
-            self._log.debug('Encrypted messages put in a queue to be sent')
+            self._log.debug('%d encrypted packet(s) put in a queue to be sent',
+                            len(packets))
 
     async def _recv_loop(self):
         """
         This loop is responsible for reading all incoming responses
-        from the network, decrypting and handling or dispatching them.
+        from the network, and handing them to the decrypt loop, which
+        in turn hands them to the dispatch loop.
+
+        Because these run separately, big responses being decrypted or
+        handled don't stop the next packets from being read.
 
         Besides `connect`, only this method ever receives data.
         """
+        stats = self._recv_stats['read']
         while self._user_connected and not self._reconnecting:
             self._log.debug('Receiving items from the network...')
             try:
@@ -524,15 +612,31 @@ class MTProtoSender:
                 self._start_reconnect(e)
                 return
 
+            received_at = time.time()  # for the message time checks
+            start = time.perf_counter()
+            await self._decrypt_queue.put((body, received_at, start))
+            stats.add(0.0, time.perf_counter() - start)
+
+    async def _decrypt_loop(self):
+        """
+        This loop is responsible for decrypting the packets read by the
+        receive loop, in a worker thread if they're big and it pays off.
+        """
+        loop = helpers.get_running_loop()
+        threaded = AES.releases_gil()
+        stats = self._recv_stats['decrypt']
+        while self._user_connected and not self._reconnecting:
+            body, received_at, queued_at = await self._decrypt_queue.get()
+
+            start = time.perf_counter()
             try:
-                message = self._state.decrypt_message_data(body)
-                if message is None:
-                    continue  # this message is to be ignored
-            except TypeNotFoundError as e:
-                # Received object which we don't know how to deserialize
-                self._log.info('Type %08x not found, remaining data %r',
-                               e.invalid_constructor_id, e.remaining)
-                continue
+                if threaded and len(body) >= THREADED_DECRYPT_SIZE:
+                    body = await loop.run_in_executor(
+                        None, self._state.decrypt_message_body, body)
+                else:
+                    body = self._state.decrypt_message_body(body)
+            except asyncio.CancelledError:
+                raise  # bypass except Exception
             except SecurityError as e:
                 # A step while decoding had the incorrect data. This message
                 # should not be considered safe and it should be ignored.
@@ -552,11 +656,49 @@ class MTProtoSender:
                 self._start_reconnect(e)
                 return
 
+            done = time.perf_counter()
+            stats.add(start - queued_at, done - start)
+            await self._dispatch_queue.put((body, received_at, done))
+
+    async def _dispatch_loop(self):
+        """
+        This loop is responsible for reading the messages out of the
+        decrypted packets, and handling or dispatching them.
+        """
+        stats = self._recv_stats['dispatch']
+        while self._user_connected and not self._reconnecting:
+            body, received_at, queued_at = await self._dispatch_queue.get()
+
+            start = time.perf_counter()
+            try:
+                message = self._state.read_message_data(body, received_at)
+                if message is None:
+                    continue  # this message is to be ignored
+            except TypeNotFoundError as e:
+                # Received object which we don't know how to deserialize
+                self._log.info('Type %08x not found, remaining data %r',
+                               e.invalid_constructor_id, e.remaining)
+                continue
+            except SecurityError as e:
+                self._log.warning('Security error while unpacking a '
+                                  'received message: %s', e)
+                continue
+            except BufferError as e:
+                self._log.warning('Invalid buffer %s', e)
+                self._start_reconnect(e)
+                return
+            except Exception as e:
+                self._log.exception('Unhandled error while reading data')
+                self._start_reconnect(e)
+                return
+
             try:
                 await self._process_message(message)
             except Exception:
                 self._log.exception('Unhandled error while processing msgs')
 
+            stats.add(start - queued_at, time.perf_counter() - start)
+
     # Response Handlers
 
     async def _process_message(self, message):
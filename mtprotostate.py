@@ -109,7 +109,8 @@ class MTProtoState:
     def write_data_as_message(self, buffer, data, content_related,
                               *, after_id=None):
         """
-        Writes a message containing the given data into buffer.
+        Appends a message containing the given data to the buffer,
+        which must be a `bytearray`.
 
         Returns the message id.
         """
@@ -123,8 +124,20 @@ class MTProtoState:
             body = GzipPacked.gzip_if_smaller(content_related,
                 bytes(InvokeAfterMsgRequest(after_id, _OpaqueRequest(data))))
 
-        buffer.write(struct.pack('<qii', msg_id, seq_no, len(body)))
-        buffer.write(body)
+        buffer += struct.pack('<qii', msg_id, seq_no, len(body))
+        buffer += body
+        return msg_id
+
+    def write_message_header(self, buffer, offset, length, content_related):
+        """
+        Writes the header of a message at the given offset of the buffer,
+        for a body of the given length which is already right after it.
+
+        Returns the message id.
+        """
+        msg_id = self._get_new_msg_id()
+        seq_no = self._get_seq_no(content_related)
+        struct.pack_into('<qii', buffer, offset, msg_id, seq_no, length)
         return msg_id
 
     def encrypt_message_data(self, data):
@@ -132,28 +145,47 @@ class MTProtoState:
         Encrypts the given message data using the current authorization key
         following MTProto 2.0 guidelines core.telegram.org/mtproto/description.
         """
-        data = struct.pack('<qq', self.salt, self.id) + data
-        padding = os.urandom(-(len(data) + 12) % 16 + 12)
+        buffer = bytearray(16)
+        buffer += data
+        return self.encrypt_message_buffer(buffer)
+
+    def encrypt_message_buffer(self, buffer):
+        """
+        Like `encrypt_message_data`, but for a `bytearray` with the message
+        data after 16 unused bytes, where the salt and session ID are written.
+        The padding is also added to the buffer itself, so no copies are made.
+        """
+        struct.pack_into('<qq', buffer, 0, self.salt, self.id)
+        buffer += os.urandom(-(len(buffer) + 12) % 16 + 12)
 
         # Being substr(what, offset, length); x = 0 for client
         # "msg_key_large = SHA256(substr(auth_key, 88+x, 32) + pt + padding)"
-        msg_key_large = sha256(
-            self.auth_key.key[88:88 + 32] + data + padding).digest()
+        msg_key_large = sha256(self.auth_key.key[88:88 + 32])
+        msg_key_large.update(buffer)
 
         # "msg_key = substr (msg_key_large, 8, 16)"
-        msg_key = msg_key_large[8:24]
+        msg_key = msg_key_large.digest()[8:24]
         aes_key, aes_iv = self._calc_key(self.auth_key.key, msg_key, True)
 
         key_id = struct.pack('<Q', self.auth_key.key_id)
-        return (key_id + msg_key +
-                AES.encrypt_ige(data + padding, aes_key, aes_iv))
+        return b''.join((key_id, msg_key,
+                         AES.encrypt_ige(buffer, aes_key, aes_iv)))
 
     def decrypt_message_data(self, body):
         """
         Inverse of `encrypt_message_data` for incoming server messages.
         """
         now = time.time()  # get the time as early as possible, even if other checks make it go unused
+        return self.read_message_data(self.decrypt_message_body(body), now)
+
+    def decrypt_message_body(self, body):
+        """
+        Decrypts an incoming server message and checks its msg_key,
+        returning the plain text to be passed to `read_message_data`.
 
+        Only the authorization key is used, so it's safe to call
+        this from a different thread.
+        """
         if len(body) < 8:
             raise InvalidBufferError(body)
 
@@ -173,6 +205,14 @@ class MTProtoState:
             raise SecurityError(
                 "Received msg_key doesn't match with expected one")
 
+        return body
+
+    def read_message_data(self, body, now):
+        """
+        Reads the message out of the plain text of an incoming server
+        message which was received at the time ``now``, unless it
+        should be ignored, in which case `None` is returned.
+        """
         reader = BinaryReader(body)
         reader.read_long()  # remote_salt
         if reader.read_long() != self.id:
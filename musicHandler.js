@@ -48,7 +48,7 @@ class MusicHandler {
 
             // Try to search music through Telegram bridge
             try {
-                const response = await this.searchMusic(cleanQuery);
+                const response = await this.searchMusic(cleanQuery, senderId);
                 
                 if (response.success && response.audio_url) {
                     // Send success message
@@ -100,7 +100,7 @@ class MusicHandler {
     /**
      * Search music via Telegram bridge
      */
-    async searchMusic(query) {
+    async searchMusic(query, senderId) {
         try {
             const response = await axios.post(`${this.telegramBridgeUrl}/search`, {
                 query: query,
@@ -108,7 +108,9 @@ class MusicHandler {
             }, {
                 timeout: 35000,
                 headers: {
-                    'Content-Type': 'application/json'
+                    'Content-Type': 'application/json',
+                    // Lets the bridge rate-limit per WhatsApp user
+                    'X-Client-Id': senderId
                 }
             });
 
@@ -8,72 +8,145 @@ import logging
 import re
 import time
 from telethon import TelegramClient, events
-from telethon.errors import SessionPasswordNeededError, PhoneCodeInvalidError
+from telethon.errors import (
+    SessionPasswordNeededError, PhoneCodeInvalidError,
+    PeerIdInvalidError, UsernameInvalidError, UsernameNotOccupiedError
+)
 from telethon.tl.types import DocumentAttributeAudio
+from config import config
+from search_correlator import SearchCorrelator
+from search_cache import normalize_query
+from metrics import time_stage
 
 logger = logging.getLogger(__name__)
 
+# Errors meaning a pinned peer is stale and must be resolved again
+STALE_PEER_ERRORS = (PeerIdInvalidError, UsernameInvalidError, UsernameNotOccupiedError)
+
+# Largest part upload.getFile serves; offsets must be aligned to it
+DOWNLOAD_PART_SIZE = 512 * 1024
+
+class SearchTimeoutError(Exception):
+    """Raised when VK Music Bot does not answer a search in time"""
+
 class MusicFetcher:
     def __init__(self, client):
         self.client = client
-        self.vk_bot_username = '@vkmusbot'
-        self.search_timeout = 30  # seconds
-        self.pending_searches = {}
-        
+        self.vk_bot_username = config['telegram']['vk_bot']
+        self.search_timeout = config['search']['timeout']
+        self.pending_searches = SearchCorrelator()
+        # Normalized query -> task of the search currently talking to the bot
+        self.inflight_searches = {}
+        self.coalesced_searches = 0
+        # Username -> InputPeer, resolved once and pinned
+        self.bot_peers = {}
+
     async def search_music(self, query):
+        """Search for music, sharing one bot round-trip between identical queries"""
+        key = normalize_query(query)
+        search_task = self.inflight_searches.get(key)
+        
+        if search_task is None:
+            search_task = asyncio.ensure_future(self.run_search(query))
+            self.inflight_searches[key] = search_task
+            search_task.add_done_callback(lambda task: self.finish_inflight_search(key, task))
+        else:
+            self.coalesced_searches += 1
+            logger.info(f"🔗 Joining in-flight search for: {query}")
+        
+        # Shield so one caller giving up does not cancel the search for the others
+        return await asyncio.shield(search_task)
+    
+    def finish_inflight_search(self, key, task):
+        """Forget a finished in-flight search"""
+        if self.inflight_searches.get(key) is task:
+            del self.inflight_searches[key]
+        
+        # Mark the exception as retrieved in case every waiter went away
+        if not task.cancelled():
+            task.exception()
+    
+    async def run_search(self, query):
         """Search for music using VK Music Bot"""
         try:
             logger.info(f"🎵 Starting music search for: {query}")
             
+            # Concurrency is bounded by the bridge's admission control, which
+            # every search goes through, so live searches are served first
+            
             # Generate unique search ID
             search_id = f"{time.time()}_{hash(query)}"
             
             # Create future for this search
-            search_future = asyncio.Future()
-            self.pending_searches[search_id] = {
-                'future': search_future,
-                'query': query,
-                'timestamp': time.time()
-            }
-            
-            # Send search query to VK Music Bot
-            await self.send_search_query(query, search_id)
+            search_future = asyncio.get_running_loop().create_future()
+            self.pending_searches.register(search_id, query, search_future)
             
-            # Wait for response with timeout
             try:
-                result = await asyncio.wait_for(search_future, timeout=self.search_timeout)
-                return result
+                # Send search query to VK Music Bot
+                message = await self.send_search_query(query, search_id)
+                self.pending_searches.bind_message(search_id, message.id)
+                
+                # Wait for response with timeout
+                with time_stage('bot_reply'):
+                    return await asyncio.wait_for(search_future, timeout=self.search_timeout)
             except asyncio.TimeoutError:
                 logger.warning(f"⏰ Search timeout for query: {query}")
-                return None
+                raise SearchTimeoutError(f"Search timed out for query: {query}")
             finally:
                 # Clean up
-                self.pending_searches.pop(search_id, None)
-                
+                self.pending_searches.remove(search_id)
+            
         except Exception as e:
+            # Only a "not found" answer yields None, so errors are never cached
             logger.error(f"Error searching music: {e}")
-            return None
+            raise
     
     async def send_search_query(self, query, search_id):
         """Send search query to VK Music Bot"""
         try:
-            # Get VK Music Bot entity
-            vk_bot = await self.client.get_entity(self.vk_bot_username)
+            vk_bot = await self.get_bot_peer(self.vk_bot_username)
             
             # Send search message
-            await self.client.send_message(vk_bot, query)
-            logger.debug(f"📤 Sent search query to VK Bot: {query}")
+            try:
+                with time_stage('send'):
+                    message = await self.client.send_message(vk_bot, query)
+            except STALE_PEER_ERRORS as e:
+                logger.warning(f"♻️ VK Bot peer is stale ({e}), resolving it again")
+                vk_bot = await self.get_bot_peer(self.vk_bot_username, refresh=True)
+                with time_stage('send'):
+                    message = await self.client.send_message(vk_bot, query)
+            
+            logger.debug(f"📤 Sent search query to VK Bot: {query} (message {message.id})")
+            return message
             
         except Exception as e:
             logger.error(f"Error sending search query: {e}")
             raise
     
+    async def get_bot_peer(self, username, refresh=False):
+        """Get a bot's InputPeer, resolving it only the first time or on refresh"""
+        peer = None if refresh else self.bot_peers.get(username)
+        if peer is None:
+            with time_stage('resolve_entity'):
+                peer = await self.client.get_input_entity(username)
+            self.bot_peers[username] = peer
+            logger.debug(f"📌 Pinned peer for {username}")
+        return peer
+    
     def setup_message_handler(self):
         """Setup message handler for VK Bot responses"""
         @self.client.on(events.NewMessage(from_users=[self.vk_bot_username]))
         async def handle_vk_response(event):
             await self.process_vk_response(event)
     
+    async def warm_up(self):
+        """Resolve every configured bot up front so searches never pay for it"""
+        for username in config['telegram']['warmup_bots']:
+            try:
+                await self.get_bot_peer(username, refresh=True)
+            except Exception as e:
+                logger.error(f"Error resolving {username} during warm-up: {e}")
+    
     async def process_vk_response(self, event):
         """Process response from VK Music Bot"""
         try:
@@ -84,11 +157,11 @@ class MusicFetcher:
                 audio_info = await self.extract_audio_info(message)
                 if audio_info:
                     # Find matching pending search
-                    await self.match_search_result(audio_info)
+                    await self.match_search_result(message, audio_info)
             
             # Check for "not found" messages
             elif message.text and self.is_not_found_message(message.text):
-                await self.handle_not_found()
+                await self.handle_not_found(message)
                 
         except Exception as e:
             logger.error(f"Error processing VK response: {e}")
@@ -133,20 +206,55 @@ class MusicFetcher:
             return None
     
     async def get_audio_url(self, message):
-        """Get downloadable URL for audio"""
-        try:
-            # Download audio to get URL
-            file_path = await message.download_media(file=bytes)
-            
-            # For now, we'll return a placeholder URL
-            # In a real implementation, you'd upload this to a file server
-            # or use Telegram's file API to get a direct URL
-            
-            return f"telegram_audio_{message.id}"
-            
-        except Exception as e:
-            logger.error(f"Error getting audio URL: {e}")
+        """Get the bridge path the audio can be streamed from"""
+        # The bytes are streamed on demand by the /audio endpoint
+        return f"/audio/{message.id}"
+    
+    async def get_audio_message(self, message_id):
+        """Fetch a VK Bot message carrying audio by its id"""
+        vk_bot = await self.get_bot_peer(self.vk_bot_username)
+        message = await self.client.get_messages(vk_bot, ids=message_id)
+        if not message or not message.audio:
             return None
+        return message
+    
+    async def iter_audio(self, message, start=0, stop=None):
+        """Yield the audio bytes of a message in [start, stop) as memoryview chunks
+
+        Chunks must not be released by callers: a write may return while the
+        transport still queues the view.
+        """
+        if stop is None:
+            stop = message.file.size
+        
+        # Telegram serves parts at offsets aligned to the part size
+        skip = start % DOWNLOAD_PART_SIZE
+        remaining = stop - start
+        stream = self.client.iter_download(
+            message.media,
+            offset=start - skip,
+            request_size=DOWNLOAD_PART_SIZE,
+            file_size=message.file.size
+        )
+        try:
+            async for chunk in stream:
+                # Trim through a memoryview; slicing the bytes would copy the part
+                chunk = memoryview(chunk)
+                if skip:
+                    chunk = chunk[skip:]
+                    skip = 0
+                if len(chunk) > remaining:
+                    chunk = chunk[:remaining]
+                
+                remaining -= len(chunk)
+                yield chunk
+                if remaining <= 0:
+                    break
+        finally:
+            # Return borrowed senders when the transfer stops early; the
+            # iterator only holds one once it has started
+            if getattr(stream, '_sender', None):
+                await stream.close()
     
     def is_not_found_message(self, text):
         """Check if message indicates no results found"""
@@ -161,52 +269,39 @@ class MusicFetcher:
         text_lower = text.lower()
         return any(re.search(pattern, text_lower) for pattern in not_found_patterns)
     
-    async def match_search_result(self, audio_info):
+    async def match_search_result(self, message, audio_info):
         """Match audio result with pending search"""
         try:
-            # For now, just complete the most recent search
-            # In a more sophisticated implementation, you'd match based on query similarity
+            search_id = self.pending_searches.match(message, audio_info)
+            if search_id is None:
+                logger.warning(f"⚠️ Unmatched audio result from VK Bot: {audio_info.get('title')}")
+                return
             
-            if self.pending_searches:
-                # Get the most recent search
-                latest_search_id = max(self.pending_searches.keys(), 
-                                     key=lambda x: self.pending_searches[x]['timestamp'])
-                
-                search_info = self.pending_searches.get(latest_search_id)
-                if search_info and not search_info['future'].done():
-                    search_info['future'].set_result(audio_info)
-                    logger.info(f"✅ Matched audio result for search: {search_info['query']}")
+            search_info = self.pending_searches.searches[search_id]
+            search_info['future'].set_result(audio_info)
+            logger.info(f"✅ Matched audio result for search: {search_info['query']}")
                     
         except Exception as e:
             logger.error(f"Error matching search result: {e}")
     
-    async def handle_not_found(self):
+    async def handle_not_found(self, message):
         """Handle "not found" response"""
         try:
-            if self.pending_searches:
-                # Get the most recent search
-                latest_search_id = max(self.pending_searches.keys(), 
-                                     key=lambda x: self.pending_searches[x]['timestamp'])
-                
-                search_info = self.pending_searches.get(latest_search_id)
-                if search_info and not search_info['future'].done():
-                    search_info['future'].set_result(None)
-                    logger.info(f"❌ No results found for search: {search_info['query']}")
+            search_id = self.pending_searches.match(message)
+            if search_id is None:
+                return
+            
+            search_info = self.pending_searches.searches[search_id]
+            search_info['future'].set_result(None)
+            logger.info(f"❌ No results found for search: {search_info['query']}")
                     
         except Exception as e:
             logger.error(f"Error handling not found: {e}")
     
     def cleanup_expired_searches(self):
         """Clean up expired searches"""
-        current_time = time.time()
-        expired_searches = []
-        
-        for search_id, search_info in self.pending_searches.items():
-            if current_time - search_info['timestamp'] > self.search_timeout:
-                expired_searches.append(search_id)
-        
-        for search_id in expired_searches:
-            search_info = self.pending_searches.pop(search_id, None)
+        for search_id in self.pending_searches.expired(self.search_timeout):
+            search_info = self.pending_searches.remove(search_id)
             if search_info and not search_info['future'].done():
                 search_info['future'].set_result(None)
                 logger.warning(f"⏰ Expired search: {search_info['query']}")
@@ -0,0 +1,151 @@
+"""
+Prefetcher
+Warms the search and audio caches with popular tracks during quiet periods
+"""
+
+import asyncio
+import logging
+import time
+from config import config
+from search_cache import MISS
+from audio_cache import document_key
+from rate_limiter import RateLimiter, AdmissionRejected, PRIORITY_PREFETCH
+
+logger = logging.getLogger(__name__)
+
+# How often popularity counts are halved so yesterday outweighs last week
+DECAY_INTERVAL = 24 * 3600
+
+
+class Prefetcher:
+    """Background task re-running popular queries ahead of peak hours"""
+
+    def __init__(self, bridge):
+        self.bridge = bridge
+        self.interval = config['prefetch']['interval']
+        self.top_k = config['prefetch']['top_k']
+        self.download_audio = config['prefetch']['download_audio']
+        # Kept well below the account's limits so live searches never hit FloodWait
+        self.rate_limiter = RateLimiter(config['prefetch']['rate_limit'], 60, burst=1)
+        self.task = None
+        self.last_decay = time.time()
+
+        self.stats = {
+            'runs': 0,
+            'searches': 0,
+            'downloads': 0,
+            'skipped_busy': 0,
+            'errors': 0
+        }
+
+    def start(self):
+        if self.task is None:
+            self.task = asyncio.ensure_future(self.run())
+            logger.info(f"🔥 Prefetcher started (top {self.top_k} every {self.interval}s)")
+
+    async def stop(self):
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+
+    async def run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.prefetch_popular()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.stats['errors'] += 1
+                logger.error(f"Error during prefetch: {e}")
+
+    async def prefetch_popular(self):
+        """Refresh the most popular queries that are missing or about to expire"""
+        search_cache = self.bridge.search_cache
+        await search_cache.flush_counts()
+        if time.time() - self.last_decay >= DECAY_INTERVAL:
+            await search_cache.decay_counts()
+            self.last_decay = time.time()
+
+        self.stats['runs'] += 1
+        for query in search_cache.top_queries(self.top_k):
+            if self.bridge.draining:
+                return
+
+            # Yield to live traffic: only work while the bridge is quiet
+            while not self.bridge.admission.is_idle():
+                self.stats['skipped_busy'] += 1
+                await asyncio.sleep(1)
+
+            try:
+                entry = await search_cache.peek(query)
+                if entry is MISS or entry[1] - time.time() < search_cache.ttl / 2:
+                    result = await self.search(query)
+                else:
+                    result = entry[0]
+
+                if result and self.download_audio:
+                    await self.fetch_audio(result)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.stats['errors'] += 1
+                logger.warning(f"Prefetch failed for {query}: {e}")
+
+    async def search(self, query):
+        """Run a search at prefetch priority, bypassing popularity counting"""
+        retry_after = self.rate_limiter.acquire('prefetch')
+        while retry_after:
+            await asyncio.sleep(retry_after)
+            retry_after = self.rate_limiter.acquire('prefetch')
+
+        try:
+            async with self.bridge.admission.slot(PRIORITY_PREFETCH):
+                result = await self.bridge.telegram_client.search_music(query)
+        except AdmissionRejected:
+            return None
+
+        self.stats['searches'] += 1
+        await self.bridge.search_cache.set(query, result)
+        logger.debug(f"🔥 Prefetched search: {query}")
+        return result
+
+    async def fetch_audio(self, result):
+        """Download a result's audio into the audio cache if it is not there yet"""
+        telegram_client = self.bridge.telegram_client
+        audio_cache = self.bridge.audio_cache
+        account = result.get('account')
+        if audio_cache.message_key(account, result['message_id']):
+            return
+
+        message = await telegram_client.get_audio_message(result['message_id'], account)
+        if not message or message.file.size > config['files']['max_size']:
+            return
+
+        cache_key = document_key(message.document)
+        audio_cache.remember_message(account, result['message_id'], cache_key,
+                                     message.file.mime_type or 'audio/mpeg')
+        if audio_cache.contains(cache_key):
+            return
+
+        cache_writer = audio_cache.writer(cache_key)
+        try:
+            async for chunk in telegram_client.iter_audio(message, 0, None, account):
+                await cache_writer.write(chunk)
+            await cache_writer.commit()
+            cache_writer = None
+            self.stats['downloads'] += 1
+            logger.debug(f"🔥 Prefetched audio: {result.get('title')}")
+        finally:
+            if cache_writer:
+                await cache_writer.abort()
+
+    def get_stats(self):
+        return {
+            **self.stats,
+            'running': self.task is not None
+        }
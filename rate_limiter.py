@@ -0,0 +1,159 @@
+"""
+Rate Limiter
+Per-client token buckets and global admission control for searches
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from contextlib import asynccontextmanager
+
+from metrics import stage_seconds
+
+logger = logging.getLogger(__name__)
+
+# Drop idle buckets once this many clients are tracked
+MAX_TRACKED_CLIENTS = 10000
+
+# Waiters with a lower value get free slots first
+PRIORITY_LIVE = 0
+PRIORITY_PREFETCH = 1
+
+
+class AdmissionRejected(Exception):
+    """Raised when a search cannot be admitted; carries a Retry-After hint"""
+
+    def __init__(self, message, retry_after):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class RateLimiter:
+    """Token bucket per client: `rate` tokens per `window` seconds, up to `burst`"""
+
+    def __init__(self, rate, window, burst=None):
+        self.refill_rate = rate / window
+        self.capacity = burst or rate
+        # client_id -> [tokens, last_refill]
+        self.buckets = {}
+        self.rejected = 0
+
+    def acquire(self, client_id):
+        """Take a token; return 0 if allowed, else seconds until one is available"""
+        now = time.monotonic()
+        bucket = self.buckets.get(client_id)
+        if bucket is None:
+            if len(self.buckets) >= MAX_TRACKED_CLIENTS:
+                self.prune(now)
+            bucket = self.buckets[client_id] = [self.capacity, now]
+
+        tokens = min(self.capacity, bucket[0] + (now - bucket[1]) * self.refill_rate)
+        bucket[1] = now
+
+        if tokens >= 1:
+            bucket[0] = tokens - 1
+            return 0
+
+        bucket[0] = tokens
+        self.rejected += 1
+        return (1 - tokens) / self.refill_rate
+
+    def prune(self, now):
+        """Forget clients whose bucket has refilled completely"""
+        full_after = self.capacity / self.refill_rate
+        self.buckets = {
+            client_id: bucket for client_id, bucket in self.buckets.items()
+            if now - bucket[1] < full_after
+        }
+
+    def get_stats(self):
+        return {
+            'tracked_clients': len(self.buckets),
+            'rejected': self.rejected
+        }
+
+
+class AdmissionController:
+    """Global concurrency limit with a bounded, time-limited priority wait queue"""
+
+    def __init__(self, max_concurrent, max_queue, queue_timeout):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.active = 0
+        self.queued = 0
+        # Heap of (priority, sequence, future); cancelled futures are skipped
+        self.waiters = []
+        self.sequence = itertools.count()
+
+        self.stats = {
+            'admitted': 0,
+            'rejected_queue_full': 0,
+            'rejected_queue_timeout': 0,
+            'total_queue_wait': 0.0
+        }
+
+    @asynccontextmanager
+    async def slot(self, priority=PRIORITY_LIVE):
+        """Hold one of the concurrent search slots for the duration of the block"""
+        queued_at = time.monotonic()
+        if self.active < self.max_concurrent and not self.waiters:
+            self.active += 1
+        else:
+            if self.queued >= self.max_queue:
+                self.stats['rejected_queue_full'] += 1
+                raise AdmissionRejected('Search queue is full', self.queue_timeout)
+
+            waiter = asyncio.get_running_loop().create_future()
+            heapq.heappush(self.waiters, (priority, next(self.sequence), waiter))
+            self.queued += 1
+            try:
+                # A releasing search hands its slot over by resolving the waiter
+                await asyncio.wait_for(waiter, timeout=self.queue_timeout)
+            except asyncio.TimeoutError:
+                self.stats['rejected_queue_timeout'] += 1
+                raise AdmissionRejected('Timed out waiting for a search slot', self.queue_timeout)
+            except asyncio.CancelledError:
+                if waiter.done() and not waiter.cancelled():
+                    # The slot was handed over just as the caller went away
+                    self.release()
+                raise
+            finally:
+                self.queued -= 1
+
+        queue_wait = time.monotonic() - queued_at
+        self.stats['total_queue_wait'] += queue_wait
+        stage_seconds.observe(queue_wait, 'queue_wait')
+        self.stats['admitted'] += 1
+        try:
+            yield
+        finally:
+            self.release()
+
+    def release(self):
+        """Hand a slot to the most urgent waiter, or free it"""
+        while self.waiters:
+            _, _, waiter = heapq.heappop(self.waiters)
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+    def is_idle(self):
+        """Check if live traffic leaves room for background work"""
+        return not self.queued and self.active < self.max_concurrent // 2
+
+    def get_stats(self):
+        return {
+            **self.stats,
+            'active': self.active,
+            'queued': self.queued,
+            'max_concurrent': self.max_concurrent,
+            'max_queue': self.max_queue,
+            'average_queue_wait': (
+                self.stats['total_queue_wait'] / self.stats['admitted']
+                if self.stats['admitted'] > 0 else 0
+            )
+        }
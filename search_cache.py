@@ -0,0 +1,221 @@
+"""
+Search Cache
+Caches VK Music Bot search results by normalized query
+"""
+
+import asyncio
+import json
+import logging
+import re
+import sqlite3
+import time
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+# Marker distinguishing a cached "not found" from a cache miss
+MISS = object()
+
+
+def normalize_query(query):
+    """Normalize a search query so equivalent queries share a cache key"""
+    return ' '.join(re.findall(r'\w+', query.lower()))
+
+
+class SearchCache:
+    """In-memory LRU cache with TTL, optionally backed by SQLite
+
+    The in-memory part is used from the event loop; every database call runs
+    on a single worker thread, so searches and streams never wait on disk.
+    """
+
+    def __init__(self, max_entries, ttl, negative_ttl, db_path=None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.entries = OrderedDict()
+        self.db = None
+        # One thread, since a SQLite connection can't be used concurrently
+        self.executor = None
+        # Lookups per normalized query, used to pick what to prefetch
+        self.query_counts = Counter()
+        self.pending_counts = Counter()
+
+        self.stats = {
+            'hits': 0,
+            'negative_hits': 0,
+            'misses': 0,
+            'evictions': 0
+        }
+
+        if db_path:
+            self.open_db(db_path)
+
+    def open_db(self, db_path):
+        """Open (and create) the on-disk backing store"""
+        try:
+            # Opened here at startup, then only used from the worker thread
+            self.db = sqlite3.connect(str(db_path), check_same_thread=False)
+            self.db.execute(
+                'CREATE TABLE IF NOT EXISTS search_cache ('
+                'query TEXT PRIMARY KEY, result TEXT, expires_at REAL)'
+            )
+            self.db.execute(
+                'CREATE TABLE IF NOT EXISTS query_counts ('
+                'query TEXT PRIMARY KEY, count REAL)'
+            )
+            self.query_counts.update(dict(self.db.execute('SELECT query, count FROM query_counts')))
+            self.db.execute('DELETE FROM search_cache WHERE expires_at < ?', (time.time(),))
+            self.db.commit()
+            self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='search-cache')
+            logger.info(f"💾 Search cache backed by {db_path}")
+        except sqlite3.Error as e:
+            logger.error(f"Failed to open search cache database: {e}")
+            self.db = None
+
+    async def get(self, query):
+        """Return the cached result (None for "not found") or MISS"""
+        key = normalize_query(query)
+        self.query_counts[key] += 1
+        self.pending_counts[key] += 1
+        entry = self.entries.get(key)
+
+        if entry is None and self.db:
+            entry = await self._run(self._load, key)
+            # A search may have stored a newer result meanwhile
+            if key in self.entries:
+                entry = self.entries[key]
+            elif entry is not None:
+                self._store(key, entry)
+
+        if entry is None or entry[1] < time.time():
+            if entry is not None:
+                self.entries.pop(key, None)
+            self.stats['misses'] += 1
+            return MISS
+
+        self.entries.move_to_end(key)
+        if entry[0] is None:
+            self.stats['negative_hits'] += 1
+        else:
+            self.stats['hits'] += 1
+        return entry[0]
+
+    async def peek(self, query):
+        """Return (result, expires_at) without touching LRU order or counters, or MISS"""
+        key = normalize_query(query)
+        entry = self.entries.get(key)
+        if entry is None and self.db:
+            entry = await self._run(self._load, key)
+        if entry is None or entry[1] < time.time():
+            return MISS
+        return entry
+
+    def top_queries(self, count):
+        """Most looked-up normalized queries, most popular first"""
+        return [query for query, _ in self.query_counts.most_common(count)]
+
+    async def decay_counts(self, factor=0.5):
+        """Age popularity so recent days weigh more than old ones"""
+        for key in list(self.query_counts):
+            self.query_counts[key] *= factor
+            if self.query_counts[key] < 0.5:
+                del self.query_counts[key]
+
+        if self.db:
+            await self._run(self._decay, factor)
+
+    async def flush_counts(self):
+        """Persist lookup counts gathered since the last flush"""
+        pending = list(self.pending_counts.items())
+        self.pending_counts.clear()
+        if self.db and pending:
+            await self._run(self._add_counts, pending)
+
+    async def set(self, query, result):
+        """Cache a search result; None caches a "not found" answer"""
+        key = normalize_query(query)
+        ttl = self.ttl if result is not None else self.negative_ttl
+        entry = (result, time.time() + ttl)
+        self._store(key, entry)
+
+        if self.db:
+            await self._run(self._save, key, json.dumps(result), entry[1])
+
+    async def close(self):
+        """Close the on-disk backing store"""
+        await self.flush_counts()
+        if self.db:
+            await self._run(self.db.close)
+            self.db = None
+            self.executor.shutdown()
+            self.executor = None
+
+    def get_stats(self):
+        """Get cache statistics"""
+        lookups = self.stats['hits'] + self.stats['negative_hits'] + self.stats['misses']
+        return {
+            **self.stats,
+            'size': len(self.entries),
+            'max_entries': self.max_entries,
+            'persistent': self.db is not None,
+            'hit_rate': (
+                (self.stats['hits'] + self.stats['negative_hits']) / lookups * 100
+                if lookups > 0 else 0
+            )
+        }
+
+    def _store(self, key, entry):
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.stats['evictions'] += 1
+
+    async def _run(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+
+    # The methods below run on the worker thread
+
+    def _load(self, key):
+        try:
+            row = self.db.execute(
+                'SELECT result, expires_at FROM search_cache WHERE query = ?', (key,)
+            ).fetchone()
+        except sqlite3.Error as e:
+            logger.error(f"Error reading search cache entry: {e}")
+            return None
+
+        if row is None:
+            return None
+        return json.loads(row[0]), row[1]
+
+    def _save(self, key, result, expires_at):
+        try:
+            self.db.execute(
+                'INSERT OR REPLACE INTO search_cache VALUES (?, ?, ?)',
+                (key, result, expires_at)
+            )
+            self.db.commit()
+        except sqlite3.Error as e:
+            logger.error(f"Error persisting search cache entry: {e}")
+
+    def _add_counts(self, counts):
+        try:
+            self.db.executemany(
+                'INSERT INTO query_counts VALUES (?, ?) '
+                'ON CONFLICT(query) DO UPDATE SET count = count + excluded.count',
+                counts
+            )
+            self.db.commit()
+        except sqlite3.Error as e:
+            logger.error(f"Error persisting query counts: {e}")
+
+    def _decay(self, factor):
+        try:
+            self.db.execute('UPDATE query_counts SET count = count * ?', (factor,))
+            self.db.execute('DELETE FROM query_counts WHERE count < 0.5')
+            self.db.commit()
+        except sqlite3.Error as e:
+            logger.error(f"Error decaying query counts: {e}")
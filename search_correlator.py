@@ -0,0 +1,123 @@
+"""
+Search Correlator
+Matches VK Music Bot replies to the searches that caused them
+"""
+
+import logging
+import re
+import time
+from collections import OrderedDict
+from difflib import SequenceMatcher
+
+logger = logging.getLogger(__name__)
+
+# Minimum similarity between a query and an audio result to prefer it over
+# plain send ordering when the bot does not quote our message
+SIMILARITY_THRESHOLD = 0.5
+
+
+def query_similarity(query, audio_info):
+    """Score how well an audio result matches a search query (0.0 - 1.0)"""
+    query_tokens = re.findall(r'\w+', query.lower())
+    result_text = f"{audio_info.get('artist', '')} {audio_info.get('title', '')}".lower()
+    result_tokens = set(re.findall(r'\w+', result_text))
+
+    if not query_tokens or not result_tokens:
+        return 0.0
+
+    token_score = sum(1 for token in query_tokens if token in result_tokens) / len(query_tokens)
+    sequence_score = SequenceMatcher(None, ' '.join(query_tokens), ' '.join(sorted(result_tokens))).ratio()
+    return max(token_score, sequence_score)
+
+
+class SearchCorrelator:
+    """Index of outstanding searches keyed by id and by outgoing message id"""
+
+    def __init__(self):
+        self.searches = {}
+        self.by_message_id = {}
+        # Search ids in the order their queries were sent to the bot
+        self.send_order = OrderedDict()
+
+    def __len__(self):
+        return len(self.searches)
+
+    def __contains__(self, search_id):
+        return search_id in self.searches
+
+    def register(self, search_id, query, future):
+        """Register a search before its query is sent"""
+        self.searches[search_id] = {
+            'future': future,
+            'query': query,
+            'timestamp': time.time(),
+            'message_id': None
+        }
+        self.send_order[search_id] = None
+
+    def bind_message(self, search_id, message_id):
+        """Record the id of the message that carried the search query"""
+        search_info = self.searches.get(search_id)
+        if search_info is None:
+            return
+
+        search_info['message_id'] = message_id
+        self.by_message_id[message_id] = search_id
+
+    def remove(self, search_id):
+        """Forget a search, returning its state if it was still tracked"""
+        search_info = self.searches.pop(search_id, None)
+        self.send_order.pop(search_id, None)
+        if search_info and search_info['message_id'] is not None:
+            self.by_message_id.pop(search_info['message_id'], None)
+        return search_info
+
+    def match(self, message, audio_info=None):
+        """Find the search id a bot message answers, or None"""
+        # 1. The bot quoted our query message
+        reply_to = getattr(message, 'reply_to_msg_id', None)
+        if reply_to is not None:
+            search_id = self.by_message_id.get(reply_to)
+            if search_id is not None and self._is_waiting(search_id):
+                return search_id
+
+        # 2. Only searches sent before this reply can be answered by it,
+        #    oldest first because the bot answers in order. Searches are
+        #    kept in send order, so the first one sent after it ends the scan
+        reply_id = getattr(message, 'id', 0)
+        candidates = []
+        for search_id in self.send_order:
+            message_id = self.searches[search_id]['message_id']
+            # The reply may arrive before send_message returns our id
+            if message_id is not None and message_id >= reply_id:
+                break
+            if self._is_waiting(search_id):
+                candidates.append(search_id)
+        if not candidates:
+            return None
+
+        # 3. Prefer a clear query/result match over plain ordering
+        if audio_info:
+            best_id, best_score = None, 0.0
+            for search_id in candidates:
+                score = query_similarity(self.searches[search_id]['query'], audio_info)
+                if score > best_score:
+                    best_id, best_score = search_id, score
+            if best_score >= SIMILARITY_THRESHOLD:
+                return best_id
+
+        return candidates[0]
+
+    def expired(self, timeout):
+        """Search ids older than the given timeout, oldest first"""
+        cutoff = time.time() - timeout
+        expired_ids = []
+        for search_id in self.send_order:
+            if self.searches[search_id]['timestamp'] > cutoff:
+                break
+            expired_ids.append(search_id)
+        return expired_ids
+
+    def _is_waiting(self, search_id):
+        search_info = self.searches.get(search_id)
+        return search_info is not None and not search_info['future'].done()
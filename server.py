@@ -6,7 +6,6 @@ Entry point for the Python Telegram bridge service
 import asyncio
 import logging
 import os
-import signal
 import sys
 from pathlib import Path
 
@@ -27,15 +26,6 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-def setup_signal_handlers():
-    """Setup signal handlers for graceful shutdown"""
-    def signal_handler(signum, frame):
-        logger.info(f"Received signal {signum}, shutting down gracefully...")
-        sys.exit(0)
-    
-    signal.signal(signal.SIGINT, signal_handler)
-    signal.signal(signal.SIGTERM, signal_handler)
-
 def check_environment():
     """Check required environment variables"""
     required_vars = [
@@ -73,13 +63,10 @@ async def main():
     try:
         logger.info("🚀 Starting WhatsApp Music Bot API Server...")
         
-        # Setup signal handlers
-        setup_signal_handlers()
-        
         # Perform startup checks
         await startup_checks()
         
-        # Start the bridge server
+        # Start the bridge server; it handles SIGINT/SIGTERM and drains before exiting
         await bridge_main()
         
     except KeyboardInterrupt:
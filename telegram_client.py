@@ -13,22 +13,42 @@ import sys
 import os
 sys.path.append(os.path.dirname(__file__))
 from music_fetcher import MusicFetcher
+from metrics import telegram_request_seconds
 
 logger = logging.getLogger(__name__)
 
+class InstrumentedTelegramClient(TelegramClient):
+    """TelegramClient timing every API request it sends"""
+    
+    async def _call(self, sender, request, ordered=False, flood_sleep_threshold=None):
+        start = time.perf_counter()
+        try:
+            return await super()._call(sender, request, ordered, flood_sleep_threshold)
+        finally:
+            telegram_request_seconds.observe(time.perf_counter() - start, type(request).__name__)
+
 class TelegramMusicClient:
-    def __init__(self):
+    def __init__(self, session_name='whatsapp_music_bot', can_authorize=True, flood_sleep_threshold=60):
         # Telegram API credentials
         self.api_id = int(os.getenv('TELEGRAM_API_ID', '0'))
         self.api_hash = os.getenv('TELEGRAM_API_HASH', '')
         self.phone_number = os.getenv('TELEGRAM_PHONE', '')
-        self.session_name = 'whatsapp_music_bot'
+        self.session_name = session_name
+        self.name = os.path.basename(session_name)
+        # Only the primary account may log in with TELEGRAM_PHONE/TELEGRAM_CODE
+        self.can_authorize = can_authorize
+        self.flood_sleep_threshold = flood_sleep_threshold
         
         # Client and components
         self.client = None
         self.music_fetcher = None
         self.connected = False
         
+        # Load and health, used by the client pool to schedule searches
+        self.active_searches = 0
+        self.consecutive_failures = 0
+        self.cooldown_until = 0
+        
         # Statistics
         self.stats = {
             'searches_performed': 0,
@@ -43,13 +63,14 @@ class TelegramMusicClient:
             if not self.api_id or not self.api_hash:
                 raise ValueError("Telegram API ID and Hash are required")
             
-            logger.info("🔗 Connecting to Telegram...")
+            logger.info(f"🔗 Connecting to Telegram as {self.name}...")
             
             # Create client
-            self.client = TelegramClient(
+            self.client = InstrumentedTelegramClient(
                 self.session_name, 
                 self.api_id, 
-                self.api_hash
+                self.api_hash,
+                flood_sleep_threshold=self.flood_sleep_threshold
             )
             
             # Connect
@@ -57,11 +78,14 @@ class TelegramMusicClient:
             
             # Check if we're authorized
             if not await self.client.is_user_authorized():
+                if not self.can_authorize:
+                    raise ValueError(f"Session {self.name} is not authorized")
                 await self.authorize()
             
             # Initialize music fetcher
             self.music_fetcher = MusicFetcher(self.client)
             self.music_fetcher.setup_message_handler()
+            await self.music_fetcher.warm_up()
             
             self.connected = True
             logger.info("✅ Connected to Telegram successfully")
@@ -116,9 +140,14 @@ class TelegramMusicClient:
                 raise Exception("Telegram client not connected")
             
             self.stats['searches_performed'] += 1
+            self.active_searches += 1
             
             logger.info(f"🎵 Searching music: {query}")
-            result = await self.music_fetcher.search_music(query)
+            try:
+                result = await self.music_fetcher.search_music(query)
+            finally:
+                self.active_searches -= 1
+            self.consecutive_failures = 0
             
             if result:
                 self.stats['successful_searches'] += 1
@@ -131,15 +160,50 @@ class TelegramMusicClient:
             
         except Exception as e:
             self.stats['failed_searches'] += 1
+            self.consecutive_failures += 1
             logger.error(f"Error searching music: {e}")
             raise
     
+    def cool_off(self, seconds):
+        """Take this account out of rotation for a while, e.g. after a flood wait"""
+        self.cooldown_until = max(self.cooldown_until, time.time() + seconds)
+        logger.warning(f"🧊 Account {self.name} cooling off for {seconds}s")
+    
+    def is_available(self):
+        """Check if this account can take searches right now"""
+        return self.connected and time.time() >= self.cooldown_until
+    
+    def get_health(self):
+        """Get load and health for this account"""
+        return {
+            'name': self.name,
+            'connected': self.connected,
+            'available': self.is_available(),
+            'active_searches': self.active_searches,
+            'consecutive_failures': self.consecutive_failures,
+            'cooldown_remaining': max(0, self.cooldown_until - time.time()),
+            'searches_performed': self.stats['searches_performed']
+        }
+    
+    async def get_audio_message(self, message_id):
+        """Get the VK Bot message holding a search result's audio"""
+        if not self.connected:
+            raise Exception("Telegram client not connected")
+        
+        return await self.music_fetcher.get_audio_message(message_id)
+    
+    def iter_audio(self, message, start=0, stop=None):
+        """Stream the audio of a message in chunks"""
+        return self.music_fetcher.iter_audio(message, start, stop)
+    
     async def disconnect(self):
         """Disconnect from Telegram"""
         try:
             if self.client:
-                await self.client.disconnect()
                 self.connected = False
+                # Persist entity and update state before the connection closes
+                self.client.session.save()
+                await self.client.disconnect()
                 logger.info("🔌 Disconnected from Telegram")
         except Exception as e:
             logger.error(f"Error disconnecting from Telegram: {e}")
@@ -154,6 +218,7 @@ class TelegramMusicClient:
         
         return {
             **self.stats,
+            'coalesced_searches': self.music_fetcher.coalesced_searches if self.music_fetcher else 0,
             'uptime_seconds': uptime,
             'uptime_formatted': self.format_uptime(uptime),
             'success_rate': (
@@ -404,6 +404,10 @@ class TelegramBaseClient(abc.ABC):
         self._borrow_sender_lock = asyncio.Lock()
         self._exported_sessions = {}
 
+        # Cache ``{dc_id: utils._TransferController}`` so that transfers
+        # start from what was last measured on the same DC
+        self._transfer_controllers = {}
+
         self._loop = None  # only used as a sanity check
         self._updates_error = None
         self._updates_handle = None
@@ -8,6 +8,12 @@ _EPOCH_NAIVE = datetime(*time.gmtime(0)[:6])
 _EPOCH_NAIVE_LOCAL = datetime(*time.localtime(0)[:6])
 _EPOCH = _EPOCH_NAIVE.replace(tzinfo=timezone.utc)
 
+# Serialized byte strings start with their length in one byte if it's short
+# enough, and are padded with zeros until the next multiple of 4 bytes
+_SHORT_LENGTHS = tuple(bytes([length]) for length in range(254))
+_PADDING = (b'', b'\0', b'\0\0', b'\0\0\0')
+_LONG_LENGTH = struct.Struct('<I')
+
 
 def _datetime_to_timestamp(dt):
     # If no timezone is specified, it is assumed to be in utc zone
@@ -112,30 +118,15 @@ class TLObject:
                 raise TypeError(
                     'bytes or str expected, not {}'.format(type(data)))
 
-        r = []
-        if len(data) < 254:
-            padding = (len(data) + 1) % 4
-            if padding != 0:
-                padding = 4 - padding
-
-            r.append(bytes([len(data)]))
-            r.append(data)
-
+        length = len(data)
+        if length < 254:
+            return b''.join((
+                _SHORT_LENGTHS[length], data, _PADDING[-(length + 1) % 4]))
         else:
-            padding = len(data) % 4
-            if padding != 0:
-                padding = 4 - padding
-
-            r.append(bytes([
-                254,
-                len(data) % 256,
-                (len(data) >> 8) % 256,
-                (len(data) >> 16) % 256
-            ]))
-            r.append(data)
-
-        r.append(bytes(padding))
-        return b''.join(r)
+            # Only 3 bytes are left for the length; longer ones wrap as they always did
+            return b''.join((
+                _LONG_LENGTH.pack((length << 8 | 254) & 0xffffffff),
+                data, _PADDING[-length % 4]))
 
     @staticmethod
     def serialize_datetime(dt):
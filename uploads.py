@@ -1,9 +1,12 @@
+import asyncio
+import collections
 import hashlib
 import io
 import itertools
 import os
 import pathlib
 import re
+import time
 import typing
 from io import BytesIO
 
@@ -575,7 +578,9 @@ class UploadMethods:
             use_cache: type = None,
             key: bytes = None,
             iv: bytes = None,
-            progress_callback: 'hints.ProgressCallback' = None) -> 'types.TypeInputFile':
+            progress_callback: 'hints.ProgressCallback' = None,
+            parallel: int = 1,
+            adaptive: bool = False) -> 'types.TypeInputFile':
         """
         Uploads a file to Telegram's servers, without sending it.
 
@@ -636,6 +641,18 @@ class UploadMethods:
                 within a file (e.g. ``2.5`` means it has sent 50% of the third
                 file, because it's between 2 and 3).
 
+            parallel (`int`, optional):
+                How many parts may be uploaded at the same time. The next
+                parts are read while earlier ones are still being sent.
+                Progress is still reported in order. By default, each
+                part is sent once the previous one is done.
+
+            adaptive (`bool`, optional):
+                Whether the part size and the parts in flight should adapt
+                to the round-trip time and bandwidth measured on the data
+                center, instead of using ``parallel``. The part size only
+                adapts if no ``part_size_kb`` is given.
+
         Returns
             :tl:`InputFileBig` if the file size is larger than 10MB,
             `InputSizedFile <telethon.tl.custom.inputsizedfile.InputSizedFile>`
@@ -665,8 +682,18 @@ class UploadMethods:
             # Opening the stream will determine the correct file size
             file_size = stream.file_size
 
+            controller = None
+            if adaptive:
+                controller = self._transfer_controllers.setdefault(
+                    self.session.dc_id, utils._TransferController())
+
             if not part_size_kb:
                 part_size_kb = utils.get_appropriated_part_size(file_size)
+                if controller and controller.bandwidth:
+                    # All parts of a file must be the same size, so only the
+                    # starting size adapts; never smaller than the default so
+                    # that big files stay within the maximum amount of parts
+                    part_size_kb = max(part_size_kb, controller.part_size // 1024)
 
             if part_size_kb > 512:
                 raise ValueError('The part size must be less or equal to 512KB')
@@ -696,53 +723,64 @@ class UploadMethods:
             self._log[__name__].info('Uploading file of %d bytes in %d chunks of %d',
                                      file_size, part_count, part_size)
 
+            # Parts being sent, oldest first, with the bytes read up to them
+            pending = collections.deque()
             pos = 0
-            for part_index in range(part_count):
-                # Read the file by in chunks of size part_size
-                part = await helpers._maybe_await(stream.read(part_size))
-
-                if not isinstance(part, bytes):
-                    raise TypeError(
-                        'file descriptor returned {}, not bytes (you must '
-                        'open the file in bytes mode)'.format(type(part)))
-
-                # `file_size` could be wrong in which case `part` may not be
-                # `part_size` before reaching the end.
-                if len(part) != part_size and part_index < part_count - 1:
-                    raise ValueError(
-                        'read less than {} before reaching the end; either '
-                        '`file_size` or `read` are wrong'.format(part_size))
-
-                pos += len(part)
-
-                # Encryption part if needed
-                if key and iv:
-                    part = AES.encrypt_ige(part, key, iv)
-
-                if not is_big:
-                    # Bit odd that MD5 is only needed for small files and not
-                    # big ones with more chance for corruption, but that's
-                    # what Telegram wants.
-                    hash_md5.update(part)
-
-                # The SavePartRequest is different depending on whether
-                # the file is too large or not (over or less than 10MB)
-                if is_big:
-                    request = functions.upload.SaveBigFilePartRequest(
-                        file_id, part_index, part_count, part)
-                else:
-                    request = functions.upload.SaveFilePartRequest(
-                        file_id, part_index, part)
-
-                result = await self(request)
-                if result:
-                    self._log[__name__].debug('Uploaded %d/%d',
-                                              part_index + 1, part_count)
-                    if progress_callback:
-                        await helpers._maybe_await(progress_callback(pos, file_size))
-                else:
-                    raise RuntimeError(
-                        'Failed to upload file part {}.'.format(part_index))
+            try:
+                for part_index in range(part_count):
+                    # Read the file by in chunks of size part_size
+                    part = await helpers._maybe_await(stream.read(part_size))
+
+                    if not isinstance(part, bytes):
+                        raise TypeError(
+                            'file descriptor returned {}, not bytes (you must '
+                            'open the file in bytes mode)'.format(type(part)))
+
+                    # `file_size` could be wrong in which case `part` may not be
+                    # `part_size` before reaching the end.
+                    if len(part) != part_size and part_index < part_count - 1:
+                        raise ValueError(
+                            'read less than {} before reaching the end; either '
+                            '`file_size` or `read` are wrong'.format(part_size))
+
+                    pos += len(part)
+
+                    # Encryption part if needed
+                    if key and iv:
+                        part = AES.encrypt_ige(part, key, iv)
+
+                    if not is_big:
+                        # Bit odd that MD5 is only needed for small files and not
+                        # big ones with more chance for corruption, but that's
+                        # what Telegram wants.
+                        hash_md5.update(part)
+
+                    # The SavePartRequest is different depending on whether
+                    # the file is too large or not (over or less than 10MB)
+                    if is_big:
+                        request = functions.upload.SaveBigFilePartRequest(
+                            file_id, part_index, part_count, part)
+                    else:
+                        request = functions.upload.SaveFilePartRequest(
+                            file_id, part_index, part)
+
+                    pending.append((asyncio.ensure_future(self._upload_part(
+                        request, part_index, part_count, controller, len(pending) + 1)), pos))
+
+                    # Reading the next part overlaps with the ones in flight
+                    window = controller.window_for(part_size) if controller else max(parallel, 1)
+                    while len(pending) >= window \
+                            or (pending and part_index == part_count - 1):
+                        task, sent = pending.popleft()
+                        await task
+                        if progress_callback:
+                            await helpers._maybe_await(progress_callback(sent, file_size))
+            finally:
+                for task, _ in pending:
+                    task.cancel()
+                # Wait for them to finish, so that no part is still being
+                # sent (or its error left unretrieved) once this returns
+                await asyncio.gather(*(t for t, _ in pending), return_exceptions=True)
 
         if is_big:
             return types.InputFileBig(file_id, part_count, file_name)
@@ -753,6 +791,24 @@ class UploadMethods:
 
     # endregion
 
+    async def _upload_part(self: 'TelegramClient', request, part_index, part_count,
+                           controller, in_flight):
+        # A part Telegram did not accept is retried on its own
+        for _ in range(max(self._request_retries, 1)):
+            start = time.monotonic()
+            if await self(request):
+                if controller:
+                    controller.observe(len(request.bytes), time.monotonic() - start, in_flight)
+                self._log[__name__].debug('Uploaded %d/%d',
+                                          part_index + 1, part_count)
+                return
+
+            if controller:
+                controller.failed()
+
+        raise RuntimeError(
+            'Failed to upload file part {}.'.format(part_index))
+
     async def _file_to_media(
             self, file, force_document=False, file_size=None,
             progress_callback=None, attributes=None, thumb=None,
@@ -1346,6 +1346,92 @@ def get_appropriated_part_size(file_size):
     return 512
 
 
+class _TransferController:
+    """
+    Picks the part size and the amount of parts kept in flight for the
+    transfers made to a DC from the bandwidth and round-trip time measured
+    there, and keeps adjusting both as parts complete.
+
+    Much like TCP's BBR, somewhat more than the bandwidth-delay product is
+    kept in flight so the bandwidth estimate can keep growing, and failures
+    make it back off. Part sizes are powers of two, so that aligned offsets
+    never make a part cross the 1MB boundaries Telegram requires.
+    """
+    MIN_PART_SIZE = 32 * 1024
+    MAX_PART_SIZE = 512 * 1024
+    MAX_WINDOW = 16
+
+    # How many times the bandwidth-delay product to keep in flight
+    GAIN = 2.5
+
+    def __init__(self):
+        self.part_size = 128 * 1024
+        self.window = 2
+        self.rtt = None  # Fastest part seen lately, in seconds
+        self.bandwidth = None  # Bytes per second, a slowly decaying maximum
+
+    def part_size_at(self, offset):
+        """
+        Part size to request at ``offset``, which must be a multiple of 4KB.
+        """
+        size = self.part_size
+        while size > 4096 and offset % size:
+            size //= 2
+        return size
+
+    def window_for(self, part_size):
+        """
+        How many parts of ``part_size`` bytes to keep in flight.
+        """
+        if not self.bandwidth:
+            return self.window
+
+        in_flight = self.GAIN * self.bandwidth * self.rtt
+        return max(1, min(self.MAX_WINDOW, math.ceil(in_flight / part_size)))
+
+    def observe(self, size, elapsed, in_flight):
+        """
+        Record that a part of ``size`` bytes took ``elapsed`` seconds while
+        ``in_flight`` parts (itself included) were being transferred.
+        """
+        if elapsed <= 0:
+            return
+
+        # Parts in flight share the link, so together they got this rate
+        rate = size * in_flight / elapsed
+        if self.bandwidth is None or rate > self.bandwidth:
+            self.bandwidth = rate
+        else:
+            # Old peaks fade so the estimate follows a link getting slower
+            self.bandwidth = 0.9 * self.bandwidth + 0.1 * rate
+
+        # Likewise the round-trip may slowly grow if no faster part comes
+        if self.rtt is None or elapsed < self.rtt * 1.01:
+            self.rtt = elapsed
+        else:
+            self.rtt *= 1.01
+
+        self._update()
+
+    def failed(self):
+        """
+        Record that a part timed out or had to be retried.
+        """
+        if self.bandwidth:
+            self.bandwidth /= 2
+            self._update()
+
+    def _update(self):
+        # Aim for at least four parts in flight, in as few requests as possible
+        in_flight = self.GAIN * self.bandwidth * self.rtt
+        part_size = self.MIN_PART_SIZE
+        while part_size * 4 < in_flight and part_size < self.MAX_PART_SIZE:
+            part_size *= 2
+
+        self.part_size = part_size
+        self.window = self.window_for(part_size)
+
+
 def encode_waveform(waveform):
     """
     Encodes the input `bytes` into a 5-bit byte-string